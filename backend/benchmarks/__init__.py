@@ -0,0 +1,5 @@
+"""
+benchmarks — Reproducible performance checks for Asana Studio.
+Micro-benchmarks for the hot paths plus a mixed read/write load scenario,
+run against the app in-process or behind a local uvicorn. See run.py.
+"""
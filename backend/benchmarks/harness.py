@@ -0,0 +1,130 @@
+"""
+harness.py — Timing, latency summaries and JSON baselines.
+Every benchmark produces a list of per-operation latencies (seconds) and
+the wall time they took; summarize() turns that into p50/p95/p99 and
+throughput, and compare() checks a run against a saved baseline.
+"""
+import json
+import platform
+import sqlite3
+import subprocess
+import time
+from datetime import datetime, timezone
+
+BASELINE_VERSION = 1
+# Only percentiles are compared; means are too sensitive to one-off stalls
+COMPARED = ("p50_ms", "p95_ms")
+
+
+def percentile(sorted_samples, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, -(-len(sorted_samples) * pct // 100))   # ceil
+    return sorted_samples[int(rank) - 1]
+
+
+def summarize(samples, wall_seconds: float, errors: int = 0) -> dict:
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        "n": n,
+        "errors": errors,
+        "mean_ms": round(sum(ordered) / n * 1000, 4) if n else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4) if n else 0.0,
+        "ops_per_sec": round(n / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+
+def measure(fn, iterations: int, warmup: int = 0, setup=None) -> dict:
+    """
+    Call `fn()` `iterations` times and summarize. `setup()`, if given, runs
+    before each call outside the timed region (e.g. clearing a cache).
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    wall = 0.0
+    for _ in range(iterations):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        wall += elapsed
+    return summarize(samples, wall)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "git": _git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def save_baseline(path: str, results: dict, config: dict):
+    with open(path, "w") as f:
+        json.dump({
+            "version": BASELINE_VERSION,
+            "environment": environment(),
+            "config": config,
+            "results": results,
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> dict:
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported baseline version {baseline.get('version')!r}")
+    return baseline
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.2) -> list:
+    """
+    Benchmarks whose p50 or p95 grew by more than `threshold` (a fraction)
+    over the baseline: [(name, metric, before, after, ratio)].
+    """
+    regressions = []
+    for name, before in baseline["results"].items():
+        after = results.get(name)
+        if after is None:
+            continue
+        for metric in COMPARED:
+            old, new = before.get(metric, 0), after.get(metric, 0)
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append((name, metric, old, new, new / old))
+    return regressions
+
+
+def format_table(results: dict) -> str:
+    header = f"{'benchmark':<44} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10}"
+    lines = [header, "-" * len(header)]
+    for name, r in results.items():
+        lines.append(
+            f"{name:<44} {r['n']:>6} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+            f"{r['p99_ms']:>9.3f} {r['ops_per_sec']:>10.1f}"
+            + (f"  ({r['errors']} errors)" if r.get("errors") else "")
+            + (f"  ({r['records_per_sec']:,.0f} records/s)" if "records_per_sec" in r else "")
+        )
+    return "\n".join(lines)
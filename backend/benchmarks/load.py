@@ -0,0 +1,125 @@
+"""
+load.py — Concurrent mixed read/write load scenario.
+N workers share one httpx.AsyncClient and pick operations by weight until
+each has sent its share of requests. The same scenario runs in-process
+(ASGI transport) or against a uvicorn server (base URL).
+"""
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.harness import summarize
+from benchmarks.micro import LIST_POSES_CASES
+
+# Operation weights: mostly catalog reads, with a steady trickle of writes
+MIX = {
+    "list_poses": 35,
+    "get_pose": 20,
+    "generate": 15,
+    "list_practices": 8,
+    "get_practice": 8,
+    "create_practice": 6,
+    "update_practice": 5,
+    "delete_practice": 3,
+}
+
+
+class _Worker:
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, pose_ids):
+        self.client = client
+        self.rng = rng
+        self.pose_ids = pose_ids
+        self.practice_ids = []   # practices this worker created and may modify
+
+    def _practice_poses(self):
+        picks = self.rng.sample(self.pose_ids, 8)
+        return [{"pose_id": pid, "position": i, "side": "both", "hold_seconds": 30}
+                for i, pid in enumerate(picks)]
+
+    async def run(self, op: str):
+        """Send one request for `op`; returns the response (or None if skipped)."""
+        rng, client = self.rng, self.client
+        if op in ("get_practice", "update_practice", "delete_practice") and not self.practice_ids:
+            op = "create_practice"
+
+        if op == "list_poses":
+            return await client.get(f"/api/poses?{rng.choice(list(LIST_POSES_CASES.values()))}"), op
+        if op == "get_pose":
+            return await client.get(f"/api/poses/{rng.choice(self.pose_ids)}"), op
+        if op == "generate":
+            return await client.post("/api/sequences/generate", json={
+                "style": rng.choice(["full_body", "power", "hip_opener", "restorative"]),
+                "duration_minutes": rng.choice([15, 30, 45]),
+                "difficulty": rng.randint(1, 5),
+            }), op
+        if op == "list_practices":
+            return await client.get("/api/practices"), op
+        if op == "get_practice":
+            return await client.get(f"/api/practices/{rng.choice(self.practice_ids)}"), op
+        if op == "create_practice":
+            r = await client.post("/api/practices", json={
+                "name": f"bench {rng.random():.6f}", "poses": self._practice_poses(),
+            })
+            if r.status_code == 200:
+                self.practice_ids.append(r.json()["id"])
+            return r, op
+        if op == "update_practice":
+            return await client.put(f"/api/practices/{rng.choice(self.practice_ids)}",
+                                    json={"poses": self._practice_poses()}), op
+        if op == "delete_practice":
+            practice_id = self.practice_ids.pop(rng.randrange(len(self.practice_ids)))
+            return await client.delete(f"/api/practices/{practice_id}"), op
+        raise ValueError(f"Unknown operation {op!r}")
+
+
+async def _run(client: httpx.AsyncClient, concurrency: int, requests: int, seed: int) -> dict:
+    r = await client.get("/api/poses?per_page=200&include_total=false")
+    r.raise_for_status()
+    pose_ids = [p["id"] for p in r.json()["poses"]]
+
+    ops, weights = zip(*MIX.items())
+    samples = {}
+    errors = {}
+
+    async def worker(index: int, count: int):
+        w = _Worker(client, random.Random(seed + index), pose_ids)
+        for _ in range(count):
+            op = w.rng.choices(ops, weights)[0]
+            start = time.perf_counter()
+            response, op = await w.run(op)
+            samples.setdefault(op, []).append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[op] = errors.get(op, 0) + 1
+        # Leave the database as we found it
+        for practice_id in w.practice_ids:
+            await client.delete(f"/api/practices/{practice_id}")
+
+    share, extra = divmod(requests, concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i, share + (i < extra)) for i in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    results = {
+        f"load/{op}": summarize(s, wall, errors.get(op, 0)) for op, s in sorted(samples.items())
+    }
+    results["load/all"] = summarize(
+        [x for s in samples.values() for x in s], wall, sum(errors.values())
+    )
+    return results
+
+
+def run_load(app=None, base_url: str = None, concurrency: int = 16,
+             requests: int = 2000, seed: int = 0) -> dict:
+    """Run the mixed scenario in-process (`app`) or against `base_url`."""
+    async def main():
+        if app is not None:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                return await _run(client, concurrency, requests, seed)
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            return await _run(client, concurrency, requests, seed)
+
+    return asyncio.run(main())
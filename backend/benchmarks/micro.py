@@ -0,0 +1,122 @@
+"""
+micro.py — Single-threaded micro-benchmarks for the hot paths:
+sequence generation, list_poses filter combinations and seeding.
+"""
+import os
+import random
+import tempfile
+
+from benchmarks.harness import measure
+
+# list_poses query strings; "cold" runs clear the response cache first
+LIST_POSES_CASES = {
+    "all": "",
+    "category": "category=Standing",
+    "category+difficulty": "category=Standing&difficulty=2",
+    "tag": "tag=hip-opener",
+    "tag+bilateral": "tag=hip-opener&bilateral_only=true",
+    "search": "q=warrior",
+    "search+category": "q=twist&category=Seated",
+    "no_total": "tag=standing&include_total=false",
+    "deep_page": "page=6&per_page=50",
+    "tags_bool": "tags_all=standing&tags_any=twist,backbend&tags_none=balancing",
+    "facets": "category=Standing&facets=true",
+    "search+facets": "q=warrior&facets=true",
+}
+
+GENERATE_CASES = [
+    # (style, duration, difficulty, planner, flow)
+    ("full_body", 20, 3, "classic", "random"),
+    ("power", 60, 4, "classic", "random"),
+    ("restorative", 30, 1, "classic", "random"),
+    ("full_body", 45, 3, "exact", "random"),
+    ("full_body", 45, 3, "classic", "optimized"),
+    ("hip_opener", 60, 3, "exact", "optimized"),
+]
+
+
+def bench_generate(iterations: int) -> dict:
+    from catalog import get_catalog
+    from routers.sequences import generate_sequence_logic
+
+    catalog = get_catalog()
+    results = {}
+    for style, duration, difficulty, planner, flow in GENERATE_CASES:
+        rng = random.Random(42)
+        results[f"generate/{style}/{duration}m/{planner}/{flow}"] = measure(
+            lambda: generate_sequence_logic(style, duration, difficulty, rng=rng,
+                                            catalog=catalog, planner=planner, flow=flow),
+            iterations, warmup=min(10, iterations),
+        )
+    return results
+
+
+def bench_list_poses(client, iterations: int) -> dict:
+    from routers.poses import list_cache
+
+    results = {}
+    for name, query in LIST_POSES_CASES.items():
+        url = f"/api/poses?{query}"
+
+        def call():
+            r = client.get(url)
+            assert r.status_code == 200, r.text
+
+        results[f"list_poses/{name}/cold"] = measure(call, iterations, warmup=3, setup=list_cache.clear)
+        results[f"list_poses/{name}/warm"] = measure(call, iterations, warmup=3)
+    return results
+
+
+def bench_import(client, iterations: int, records: int = 1000, poses_per_item: int = 12) -> dict:
+    """
+    POST /api/library/import of `records` NDJSON items; adds records_per_sec.
+    The imported items are named with a per-run prefix and deleted again,
+    so a --db database ends up as it started.
+    """
+    import json
+    import uuid
+    from catalog import get_catalog
+    from database import write_connection
+    from pagination import like_prefix
+
+    rng = random.Random(42)
+    prefix = f"Bench import {uuid.uuid4().hex[:8]} "
+    pose_ids = [p.id for p in get_catalog().poses]
+    body = "\n".join(
+        json.dumps({"kind": rng.choice(("practice", "sequence")), "name": f"{prefix}{i}",
+                    "style": "full_body",
+                    "poses": [{"pose_id": rng.choice(pose_ids), "hold_seconds": 30}
+                              for _ in range(poses_per_item)]})
+        for i in range(records)
+    )
+
+    def call():
+        r = client.post("/api/library/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+        assert r.status_code == 200 and r.json()["valid"] == records, r.text
+
+    def cleanup():
+        with write_connection() as conn:
+            for table in ("practices", "sequences"):
+                conn.execute(f"DELETE FROM {table} WHERE name LIKE ? ESCAPE '\\'", (like_prefix(prefix),))
+
+    try:
+        result = measure(call, iterations, warmup=1, setup=cleanup)
+    finally:
+        cleanup()
+    result["records_per_sec"] = round(result["ops_per_sec"] * records, 1)
+    return {f"library_import/{records}x{poses_per_item}": result}
+
+
+def bench_seed(iterations: int) -> dict:
+    from seed_poses import seed_database
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = iter(os.path.join(tmp, f"seed-{i}.db") for i in range(iterations))
+        results["seed_database/fresh"] = measure(lambda: seed_database(next(paths)), iterations)
+
+        # Re-seeding an up-to-date database should be a cheap hash check
+        current = os.path.join(tmp, "current.db")
+        seed_database(current)
+        results["seed_database/noop"] = measure(lambda: seed_database(current), iterations)
+    return results
@@ -0,0 +1,136 @@
+"""
+run.py — Benchmark runner.
+
+    python backend/benchmarks/run.py                       # micro + in-process load
+    python backend/benchmarks/run.py --target uvicorn      # load via a local server
+    python backend/benchmarks/run.py --save baseline.json
+    python backend/benchmarks/run.py --compare baseline.json --threshold 0.25
+
+Runs against a scratch copy of the seeded database so results don't depend
+on (or disturb) local data; --db points it at a prebuilt database instead
+(e.g. one from synthetic.py). Exits 1 when --compare finds a regression.
+"""
+import argparse
+import contextlib
+import io
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def uvicorn_server(db_path: str, workers: int = 1):
+    """Serve main:app from a subprocess on a free port; yields the base URL."""
+    import httpx
+
+    port = _free_port()
+    env = dict(os.environ, ASANA_DB_PATH=db_path)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not come up")
+            time.sleep(0.1)
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Asana Studio benchmarks")
+    parser.add_argument("--suite", choices=["all", "micro", "load"], default="all")
+    parser.add_argument("--target", choices=["inprocess", "uvicorn"], default="inprocess",
+                        help="where the load scenario sends requests")
+    parser.add_argument("--iterations", type=int, default=200, help="per micro-benchmark")
+    parser.add_argument("--seed-iterations", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="total load requests")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--db", metavar="PATH", help="benchmark this database (see synthetic.py)")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed p50/p95 growth over the baseline (fraction)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.abspath(args.db) if args.db else os.path.join(tmp, "bench.db")
+        os.environ["ASANA_DB_PATH"] = db_path   # before database is imported
+
+        from seed_poses import ensure_seeded
+        with contextlib.redirect_stdout(io.StringIO()):
+            ensure_seeded(db_path)
+
+        from benchmarks import harness, micro
+        from benchmarks.load import run_load
+        from database import close_pool
+        from fastapi.testclient import TestClient
+        from main import app
+
+        results = {}
+        if args.suite in ("all", "micro"):
+            with TestClient(app) as client:
+                results.update(micro.bench_generate(args.iterations))
+                results.update(micro.bench_list_poses(client, args.iterations))
+                results.update(micro.bench_import(client, max(1, args.iterations // 20)))
+            with contextlib.redirect_stdout(io.StringIO()):
+                results.update(micro.bench_seed(args.seed_iterations))
+
+        if args.suite in ("all", "load"):
+            if args.target == "inprocess":
+                results.update(run_load(app=app, concurrency=args.concurrency,
+                                        requests=args.requests))
+            else:
+                close_pool()   # the server gets the database to itself
+                with uvicorn_server(db_path, args.workers) as base_url:
+                    results.update(run_load(base_url=base_url, concurrency=args.concurrency,
+                                            requests=args.requests))
+        close_pool()
+
+    print(harness.format_table(results))
+
+    config = {k: v for k, v in vars(args).items() if k not in ("save", "compare")}
+    if args.save:
+        harness.save_baseline(args.save, results, config)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        baseline = harness.load_baseline(args.compare)
+        if baseline["config"].get("target") != args.target:
+            print(f"\nWarning: baseline was recorded with --target {baseline['config'].get('target')}")
+        regressions = harness.compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.compare}:")
+            for name, metric, before, after, ratio in regressions:
+                print(f"  {name} {metric}: {before:.3f} → {after:.3f} ms ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo regressions over {args.compare} (threshold {args.threshold:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+synthetic.py — Production-sized datasets for scale testing.
+Derives studio-specific variations from POSES (same tuple format, same
+slug and bilateral expansion as seeding), then bulk-loads them alongside
+saved practices and sequences:
+
+    python backend/benchmarks/synthetic.py big.db --poses 100000 --tags-per-pose 10 \\
+        --practices 1000000
+    python backend/benchmarks/run.py --db big.db
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SUMMARY_TABLES, get_connection, init_db, refresh_summaries, set_meta
+from seed_poses import POSES, _expand_poses, seed_database
+
+STUDIOS = ("Harbor", "Cedar", "Lotus Loft", "Northside", "Sunwater", "Granite",
+           "Riverbend", "Juniper", "Old Mill", "Skyline", "Tidewater", "Willow")
+# (name prefix, difficulty shift, hold multiplier, description suffix)
+MODIFIERS = (
+    ("Wall-Supported", -1, 1.5, "Use the wall for balance and alignment."),
+    ("Block-Assisted", -1, 1.25, "Blocks bring the floor closer."),
+    ("Strap", -1, 1.25, "A strap extends the reach."),
+    ("Chair", -1, 1.0, "Practised seated or with a chair for support."),
+    ("Flowing", 0, 0.5, "Move in and out with the breath."),
+    ("Pulsing", 0, 0.5, "Small rhythmic pulses at the end range."),
+    ("Long-Hold", 0, 2.0, "Held for an extended yin-style duration."),
+    ("Bound", 1, 1.0, "Hands bind to deepen the shape."),
+    ("Revolved", 1, 1.0, "Adds a twist through the torso."),
+    ("Lifted", 1, 0.75, "Lift the back heel or hands for extra challenge."),
+)
+SYNTHETIC_TAGS = ("props", "wall", "gentle", "dynamic", "yin", "prenatal", "therapeutic",
+                  "breath", "alignment", "partner", "mobility", "stability")
+# Keep synthetic holds within what the sequence planner expects
+HOLD_BOUNDS = (10, 300)
+BATCH_ROWS = 50_000
+
+_VERSION_TRIGGERS = [f"{table}_version_{event}" for table in ("poses", "pose_tags")
+                     for event in ("insert", "update", "delete")]
+_FTS_TRIGGERS = ["poses_fts_insert", "poses_fts_update", "poses_fts_delete",
+                 "pose_tags_fts_insert", "pose_tags_fts_delete"]
+_SUMMARY_TRIGGERS = [f"{child}_summary_{event}" for _, child, _ in SUMMARY_TABLES
+                     for event in ("insert", "update", "delete")]
+
+
+def synthetic_poses(count: int, tags_per_pose: int = 4, seed: int = 0):
+    """
+    Yield `count` POSES-format tuples, each a studio variation of a seed
+    pose. Extra tags come from the seed vocabulary plus SYNTHETIC_TAGS and
+    per-studio tags, so tag selectivity ranges from common to rare.
+    """
+    rng = random.Random(seed)
+    vocabulary = sorted({t for p in POSES for t in p[6]} | set(SYNTHETIC_TAGS))
+    for k in range(count):
+        english, sanskrit, category, diff, hold, bilateral, tags, desc = rng.choice(POSES)
+        prefix, shift, scale, note = rng.choice(MODIFIERS)
+        studio = rng.choice(STUDIOS)
+
+        extra = max(0, tags_per_pose - len(tags) - 1)
+        pose_tags = list(dict.fromkeys(
+            list(tags) + rng.sample(vocabulary, min(extra, len(vocabulary)))
+            + [f"studio-{studio.lower().replace(' ', '-')}"]
+        ))
+        yield (
+            f"{prefix} {english} ({studio} #{k + 1})",
+            f"{prefix} {sanskrit}" if sanskrit else None,
+            category,
+            min(5, max(1, diff + shift)),
+            min(HOLD_BOUNDS[1], max(HOLD_BOUNDS[0], int(hold * scale) // 5 * 5)),
+            bilateral,
+            pose_tags,
+            f"{desc} {note}",
+        )
+
+
+def _batches(rows, size: int = BATCH_ROWS):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def load_poses(conn, poses) -> int:
+    """
+    Append poses to an already seeded database. Search and version
+    triggers are dropped for the load; init_db() recreates them and
+    rebuilds the search index afterwards. Returns the pose rows inserted.
+    """
+    for trigger in _VERSION_TRIGGERS + _FTS_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.commit()
+
+    next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM poses").fetchone()[0]
+    ids = {}
+    inserted = 0
+    for batch in _batches(_expand_poses(list(poses))):
+        pose_rows, tag_rows = [], []
+        for slug, parent_slug, english, sanskrit, desc, category, diff, bilateral, hold, tags in batch:
+            ids[slug] = pose_id = next_id
+            next_id += 1
+            pose_rows.append((pose_id, english, sanskrit, slug, desc, category, diff,
+                              bilateral, hold, ids[parent_slug] if parent_slug else None))
+            tag_rows.extend((pose_id, tag) for tag in tags)
+        with conn:
+            conn.executemany("""
+                INSERT INTO poses (id, english_name, sanskrit_name, slug, description,
+                                   category, difficulty, is_bilateral, default_hold_seconds,
+                                   parent_pose_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, pose_rows)
+            conn.executemany("INSERT INTO pose_tags (pose_id, tag) VALUES (?, ?)", tag_rows)
+        inserted += len(pose_rows)
+
+    with conn:
+        version = conn.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()[0]
+        set_meta(conn, "version", int(version) + 1)
+        set_meta(conn, "updated_at", int(time.time()))
+    return inserted
+
+
+def load_saved(conn, table: str, count: int, poses_per_item: int = 12, seed: int = 0) -> int:
+    """
+    Bulk-insert `count` saved practices or sequences with their pose rows.
+    Summary triggers are dropped for the load; init_db() recreates them and
+    the summary columns are then refreshed in one pass.
+    """
+    for trigger in _SUMMARY_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.commit()
+
+    rng = random.Random(seed)
+    pose_ids = [r[0] for r in conn.execute("SELECT id FROM poses")]
+    child = {"practices": ("practice_poses", "practice_id"),
+             "sequences": ("sequence_poses", "sequence_id")}[table]
+    next_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+    batch_items = max(1, BATCH_ROWS // poses_per_item)
+    for start in range(0, count, batch_items):
+        n = min(batch_items, count - start)
+        parents, children = [], []
+        for item_id in range(next_id + start, next_id + start + n):
+            day = rng.randrange(3 * 365)
+            if table == "practices":
+                parents.append((item_id, f"Practice {item_id}", day))
+            else:
+                parents.append((item_id, f"Sequence {item_id}", rng.choice(["full_body", "power", "restorative"]),
+                                rng.randint(1, 5), day))
+            for position, pose_id in enumerate(rng.sample(pose_ids, poses_per_item)):
+                children.append((item_id, pose_id, position, "both", rng.choice((15, 30, 45, 60))))
+        with conn:
+            if table == "practices":
+                conn.executemany(
+                    "INSERT INTO practices (id, name, created_at) "
+                    "VALUES (?, ?, datetime('now', '-' || ? || ' days'))", parents)
+            else:
+                conn.executemany(
+                    "INSERT INTO sequences (id, name, style, difficulty, created_at) "
+                    "VALUES (?, ?, ?, ?, datetime('now', '-' || ? || ' days'))", parents)
+            conn.executemany(
+                f"INSERT INTO {child[0]} ({child[1]}, pose_id, position, side, hold_seconds) "
+                "VALUES (?, ?, ?, ?, ?)", children)
+    return count
+
+
+def build(path: str, poses: int = 10_000, tags_per_pose: int = 4, practices: int = 0,
+          sequences: int = 0, poses_per_item: int = 12, seed: int = 0) -> dict:
+    """Seed `path` from POSES, then add the synthetic data. Returns row counts."""
+    seed_database(path)
+    conn = get_connection(path)
+    conn.execute("PRAGMA synchronous=OFF")
+    try:
+        load_poses(conn, synthetic_poses(poses, tags_per_pose, seed))
+        if practices:
+            load_saved(conn, "practices", practices, poses_per_item, seed)
+        if sequences:
+            load_saved(conn, "sequences", sequences, poses_per_item, seed + 1)
+        init_db(path)   # recreate triggers, rebuild the search index
+        with conn:
+            for summary in SUMMARY_TABLES:
+                refresh_summaries(conn, *summary)
+        conn.execute("ANALYZE")
+        conn.commit()
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("poses", "pose_tags", "practices", "practice_poses",
+                              "sequences", "sequence_poses")}
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a large synthetic Asana Studio database")
+    parser.add_argument("path")
+    parser.add_argument("--poses", type=int, default=10_000, help="synthetic poses before L/R expansion")
+    parser.add_argument("--tags-per-pose", type=int, default=4)
+    parser.add_argument("--practices", type=int, default=0)
+    parser.add_argument("--sequences", type=int, default=0)
+    parser.add_argument("--poses-per-item", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} already exists")
+    start = time.perf_counter()
+    counts = build(args.path, args.poses, args.tags_per_pose, args.practices,
+                   args.sequences, args.poses_per_item, args.seed)
+    elapsed = time.perf_counter() - start
+    rows = sum(counts.values())
+    print(", ".join(f"{n:,} {table}" for table, n in counts.items()))
+    print(f"✅ Built {args.path} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+build_seed_db.py — Build the prebuilt, seeded database artifact.
+Run at build time so fresh deploys copy a compact file instead of
+replaying POSES on first boot:
+
+    python backend/build_seed_db.py [output_path]
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import get_connection
+from seed_poses import SEED_ARTIFACT_PATH, seed_database, seed_hash
+
+
+def build(path: str = SEED_ARTIFACT_PATH):
+    tmp = path + ".building"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(tmp + suffix):
+            os.remove(tmp + suffix)
+
+    seed_database(tmp)
+    conn = get_connection(tmp)
+    conn.execute("INSERT INTO poses_fts (poses_fts) VALUES ('optimize')")
+    conn.execute("ANALYZE")
+    conn.commit()
+    # Leave a single self-contained file: no WAL, no free pages
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("VACUUM")
+    conn.close()
+
+    os.replace(tmp, path)
+    print(f"✅ Built {path} ({os.path.getsize(path) // 1024} KB, seed {seed_hash()})")
+
+
+if __name__ == "__main__":
+    build(sys.argv[1] if len(sys.argv) > 1 else SEED_ARTIFACT_PATH)
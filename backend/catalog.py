@@ -0,0 +1,261 @@
+"""
+catalog.py — In-memory pose catalog for Asana Studio.
+Poses and tags only change when the database is seeded, so they are read
+once into immutable records with prebuilt indexes and served from memory.
+"""
+import hashlib
+import re
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from database import read_connection, get_meta, run_in_db
+from fast_json import dumps, join_array, splice
+from metrics import timed_query
+
+# How often get_catalog() checks the database's catalog version
+CATALOG_CHECK_SECONDS = 2.0
+
+
+class PoseRecord(NamedTuple):
+    """One pose, in the same field order as `SELECT * FROM poses` plus tags."""
+    id: int
+    english_name: str
+    sanskrit_name: Optional[str]
+    slug: str
+    description: Optional[str]
+    category: str
+    difficulty: int
+    is_bilateral: int
+    default_hold_seconds: int
+    parent_pose_id: Optional[int]
+    tags: tuple
+    ordinal: int  # position in catalog order (category, difficulty, english_name, id)
+
+    def to_dict(self) -> dict:
+        pose = self._asdict()
+        del pose["ordinal"]
+        pose["tags"] = list(self.tags)
+        return pose
+
+
+POSE_COLUMNS = PoseRecord._fields[:-2]
+
+# Set-bit positions of every byte value, for walking bitsets byte by byte
+_BYTE_BITS = tuple(tuple(i for i in range(8) if b >> i & 1) for b in range(256))
+_NONZERO_BYTE = re.compile(b"[^\x00]")
+
+
+def bitset(ordinals, size: int) -> int:
+    """An int with bit `o` set for each ordinal, built in O(size)."""
+    buf = bytearray((size + 7) // 8)
+    for o in ordinals:
+        buf[o >> 3] |= 1 << (o & 7)
+    return int.from_bytes(buf, "little")
+
+
+def iter_bits(bits: int, start: int = 0):
+    """Set bit positions of `bits` in ascending order, from `start` on."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for m in _NONZERO_BYTE.finditer(data, start >> 3):
+        base = m.start() * 8
+        for bit in _BYTE_BITS[data[m.start()]]:
+            if base + bit >= start:
+                yield base + bit
+
+
+class PoseCatalog:
+    """
+    Immutable snapshot of the poses and pose_tags tables.
+
+    `poses` is sorted in the API's listing order. The filter indexes are
+    bitsets over those ordinals (bit i = poses[i]), so filters combine with
+    & | ~, counts are bit_count(), and results come out already ordered.
+    """
+
+    def __init__(self, rows, tag_rows, version: int = 0, updated_at: int = 0):
+        """`rows` must already be in listing order (see build_catalog)."""
+        self.version = version
+        self.updated_at = updated_at
+        # The version counter alone repeats across freshly built databases
+        content = dumps([[tuple(r) for r in rows], [tuple(t) for t in tag_rows]])
+        self.digest = hashlib.sha1(content).hexdigest()[:12]
+        tags_by_pose = {}
+        for pose_id, tag in tag_rows:
+            tags_by_pose.setdefault(pose_id, []).append(tag)
+
+        self.poses = tuple(
+            PoseRecord(*tuple(r), tags=tuple(tags_by_pose.get(r["id"], ())), ordinal=i)
+            for i, r in enumerate(rows)
+        )
+        self.sort_keys = tuple((p.category, p.difficulty, p.english_name, p.id) for p in self.poses)
+        self.by_id = {p.id: p for p in self.poses}
+        self.by_slug = {p.slug: p for p in self.poses}
+
+        by_category, by_difficulty, by_tag, by_parent = {}, {}, {}, {}
+        for p in self.poses:
+            by_category.setdefault(p.category, []).append(p.ordinal)
+            by_difficulty.setdefault(p.difficulty, []).append(p.ordinal)
+            for tag in p.tags:
+                by_tag.setdefault(tag, []).append(p.ordinal)
+            if p.parent_pose_id is not None:
+                by_parent.setdefault(p.parent_pose_id, []).append(p)
+
+        size = len(self.poses)
+        self.all_bits = (1 << size) - 1
+        self.category_bits = {k: bitset(v, size) for k, v in by_category.items()}
+        self.difficulty_bits = {k: bitset(v, size) for k, v in by_difficulty.items()}
+        self.tag_bits = {k: bitset(v, size) for k, v in by_tag.items()}
+        self.bilateral_bits = bitset((p.ordinal for p in self.poses if p.is_bilateral), size)
+        self.top_level_bits = bitset((p.ordinal for p in self.poses if p.parent_pose_id is None), size)
+        self.by_parent = {k: tuple(sorted(v, key=lambda p: p.id)) for k, v in by_parent.items()}
+
+        self.category_counts = [
+            {"category": c, "count": len(by_category[c])} for c in sorted(by_category)
+        ]
+        self.tag_counts = [
+            {"tag": t, "count": len(o)}
+            for t, o in sorted(by_tag.items(), key=lambda kv: (-len(kv[1]), kv[0]))
+        ]
+
+        # Memo of search-match bitsets per normalized query (see routers/poses.py)
+        self.search_matches = {}
+        # Pre-encoded JSON fragments, filled on first use
+        self._pose_json = [None] * len(self.poses)
+        self._encoded = {}
+
+    def __len__(self):
+        return len(self.poses)
+
+    def select(self, bits: int, start: int = 0):
+        """Poses whose bits are set, in listing order, from ordinal `start` on."""
+        return map(self.poses.__getitem__, iter_bits(bits, start))
+
+    def variations(self, pose_id: int) -> tuple:
+        return self.by_parent.get(pose_id, ())
+
+    def pose_json(self, record: PoseRecord) -> bytes:
+        """The pose's listing JSON, encoded once per snapshot."""
+        body = self._pose_json[record.ordinal]
+        if body is None:
+            body = self._pose_json[record.ordinal] = dumps(record.to_dict())
+        return body
+
+    def encoded(self, key, build) -> bytes:
+        """JSON bytes of `build()`, encoded once per snapshot and `key`."""
+        body = self._encoded.get(key)
+        if body is None:
+            body = self._encoded[key] = dumps(build())
+        return body
+
+    def detail(self, record: PoseRecord) -> dict:
+        """The pose with its variations and parent, as GET /api/poses/{id} serves it."""
+        pose = record.to_dict()
+        pose["variations"] = [
+            {"id": v.id, "english_name": v.english_name, "sanskrit_name": v.sanskrit_name,
+             "slug": v.slug, "difficulty": v.difficulty}
+            for v in self.variations(record.id)
+        ]
+
+        if record.parent_pose_id:
+            parent = self.by_id.get(record.parent_pose_id)
+            pose["parent"] = (
+                {"id": parent.id, "english_name": parent.english_name, "sanskrit_name": parent.sanskrit_name}
+                if parent else None
+            )
+
+        return pose
+
+    def detail_json(self, record: PoseRecord) -> bytes:
+        """detail() encoded once per snapshot."""
+        return self.encoded(("pose", record.id), lambda: self.detail(record))
+
+
+def embed_pose_details(item: dict, catalog: PoseCatalog) -> bytes:
+    """A saved practice or sequence, encoded with each pose row's full detail under "pose"."""
+    def row_json(row):
+        record = catalog.by_id.get(row["pose_id"])
+        return splice(row, pose=catalog.detail_json(record) if record else b"null")
+
+    fields = {k: v for k, v in item.items() if k != "poses"}
+    return splice(fields, poses=join_array(map(row_json, item["poses"])))
+
+
+def _read_version(conn):
+    return int(get_meta(conn, "version") or 0), int(get_meta(conn, "updated_at") or 0)
+
+
+def read_catalog(conn) -> PoseCatalog:
+    # Version first: a change landing mid-read shows up as a newer
+    # version on the next check and triggers another rebuild.
+    version, updated_at = _read_version(conn)
+    rows = conn.execute(f"""
+        SELECT {', '.join(POSE_COLUMNS)} FROM poses
+        ORDER BY category, difficulty, english_name, id
+    """).fetchall()
+    tag_rows = conn.execute("SELECT pose_id, tag FROM pose_tags ORDER BY id").fetchall()
+    return PoseCatalog(rows, tag_rows, version, updated_at)
+
+
+def build_catalog() -> PoseCatalog:
+    with read_connection() as conn, timed_query("build_catalog"):
+        return read_catalog(conn)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_next_check = 0.0
+
+
+def load_catalog() -> PoseCatalog:
+    """(Re)build the catalog from the database and swap it in atomically."""
+    global _catalog, _next_check
+    catalog = build_catalog()
+    with _catalog_lock:
+        _catalog = catalog
+        _next_check = time.monotonic() + CATALOG_CHECK_SECONDS
+    return catalog
+
+
+def get_catalog() -> PoseCatalog:
+    """
+    Current snapshot, built on first use if the lifespan hook hasn't run.
+    Every CATALOG_CHECK_SECONDS one request also compares the database's
+    catalog version and rebuilds if the pose data has changed.
+    """
+    global _catalog, _next_check
+    catalog = _catalog
+    if catalog is not None and time.monotonic() < _next_check:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is not None and time.monotonic() < _next_check:
+            return _catalog
+        if _catalog is not None:
+            with read_connection() as conn, timed_query("catalog_version"):
+                version, _ = _read_version(conn)
+            if version != _catalog.version:
+                _catalog = None
+        if _catalog is None:
+            _catalog = build_catalog()
+        _next_check = time.monotonic() + CATALOG_CHECK_SECONDS
+        return _catalog
+
+
+async def get_catalog_async() -> PoseCatalog:
+    """
+    get_catalog() for async handlers: a fresh snapshot is returned straight
+    from memory, and only the periodic version check (or a rebuild) goes
+    through the database executor.
+    """
+    catalog = _catalog
+    if catalog is not None and time.monotonic() < _next_check:
+        return catalog
+    return await run_in_db(get_catalog)
+
+
+def invalidate_catalog():
+    """Drop the current snapshot; the next get_catalog() rebuilds it."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
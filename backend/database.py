@@ -2,23 +2,434 @@
 database.py — SQLite setup for Asana Studio.
 Pure sqlite3, no ORM. Clean, readable SQL.
 """
+import asyncio
+import functools
+import json
 import sqlite3
 import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "asana_studio.db")
+DB_PATH = os.environ.get("ASANA_DB_PATH") or os.path.join(os.path.dirname(__file__), "asana_studio.db")
 
+# Pool sizing — readers are pooled, writes go through one serialized connection.
+POOL_SIZE = int(os.environ.get("ASANA_DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.environ.get("ASANA_DB_POOL_TIMEOUT", "10"))
+MMAP_SIZE = int(os.environ.get("ASANA_DB_MMAP_SIZE", str(64 * 1024 * 1024)))
+# Async handlers run their queries on a dedicated executor: one thread per
+# pooled reader plus the writer, and at most MAX_PENDING calls queued or running.
+DB_WORKERS = int(os.environ.get("ASANA_DB_WORKERS", str(POOL_SIZE + 1)))
+DB_MAX_PENDING = int(os.environ.get("ASANA_DB_MAX_PENDING", "256"))
 
-def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection (or executor slot) frees up within the timeout."""
+
+
+def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
     return conn
 
 
-def init_db():
+def get_connection(path: str = None) -> sqlite3.Connection:
+    """Open a standalone connection (scripts, schema setup, seeding)."""
+    return _configure(sqlite3.connect(path or DB_PATH))
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reader connections plus a single serialized writer.
+    Connections are opened lazily, configured once, and always returned
+    to the pool — even when the caller raises.
+    """
+
+    def __init__(self, path: str, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._stats = {
+            "acquired": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0,
+            "timeouts": 0, "writes": 0, "write_wait_seconds_total": 0.0,
+            "write_wait_seconds_max": 0.0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        return _configure(sqlite3.connect(self.path, check_same_thread=False))
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            grow = self._created < self.size
+            if grow:
+                self._created += 1
+        if grow:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(f"No database connection available after {self.timeout}s")
+
+    def _release(self, conn: sqlite3.Connection):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(conn)
+
+    def _record_wait(self, prefix: str, waited: float):
+        with self._lock:
+            self._stats[f"{prefix}_seconds_total"] += waited
+            if waited > self._stats[f"{prefix}_seconds_max"]:
+                self._stats[f"{prefix}_seconds_max"] = waited
+
+    @contextmanager
+    def reader(self):
+        start = time.perf_counter()
+        conn = self._acquire()
+        with self._lock:
+            self._in_use += 1
+            self._stats["acquired"] += 1
+        self._record_wait("wait", time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._release(conn)
+
+    @contextmanager
+    def writer(self):
+        """
+        Serialized write connection. Each use is one BEGIN IMMEDIATE
+        transaction: committed on success, rolled back on error.
+        """
+        start = time.perf_counter()
+        if not self._writer_lock.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(f"Database writer busy for more than {self.timeout}s")
+        try:
+            self._record_wait("write_wait", time.perf_counter() - start)
+            with self._lock:
+                self._stats["writes"] += 1
+            if self._writer is None:
+                self._writer = self._connect()
+                self._writer.isolation_level = None  # transactions are explicit below
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        finally:
+            self._writer_lock.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "idle": self._created - self._in_use,
+            })
+        stats["avg_wait_seconds"] = (
+            stats["wait_seconds_total"] / stats["acquired"] if stats["acquired"] else 0.0
+        )
+        return stats
+
+    def close(self):
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def read_connection():
+    """Context manager yielding a pooled reader connection."""
+    return get_pool().reader()
+
+
+def write_connection():
+    """Context manager yielding the serialized writer inside one transaction."""
+    return get_pool().writer()
+
+
+def pool_stats() -> dict:
+    return get_pool().stats()
+
+
+class DBExecutor:
+    """
+    Bounded thread executor for blocking database work called from async
+    handlers. Callers beyond `max_pending` wait for a slot (back-pressure)
+    and get PoolTimeout if none frees up within `timeout`.
+    """
+
+    def __init__(self, workers: int = DB_WORKERS, max_pending: int = DB_MAX_PENDING,
+                 timeout: float = POOL_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asana-db")
+        self._slots = weakref.WeakKeyDictionary()   # event loop -> asyncio.Semaphore
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "rejected": 0, "pending": 0, "pending_max": 0}
+
+    def _count(self, key: str, delta: int = 1):
+        with self._lock:
+            self._stats[key] += delta
+            if self._stats["pending"] > self._stats["pending_max"]:
+                self._stats["pending_max"] = self._stats["pending"]
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_pending)
+        try:
+            await asyncio.wait_for(slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._count("rejected")
+            raise PoolTimeout(f"Database queue full for more than {self.timeout}s")
+        self._count("submitted")
+        self._count("pending")
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            self._count("pending", -1)
+            slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "workers": self.workers, "max_pending": self.max_pending}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_executor = None
+
+
+def get_executor() -> DBExecutor:
+    global _executor
+    if _executor is None:
+        with _pool_lock:
+            if _executor is None:
+                _executor = DBExecutor()
+    return _executor
+
+
+async def run_in_db(fn, *args, **kwargs):
+    """Await `fn(*args, **kwargs)` on the database executor."""
+    return await get_executor().run(fn, *args, **kwargs)
+
+
+def executor_stats() -> dict:
+    return get_executor().stats()
+
+
+def close_pool():
+    global _pool, _executor
+    with _pool_lock:
+        if _executor is not None:
+            _executor.close()
+            _executor = None
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+# (table, child table, foreign key) for saved items with summary columns
+SUMMARY_TABLES = (
+    ("practices", "practice_poses", "practice_id"),
+    ("sequences", "sequence_poses", "sequence_id"),
+)
+SUMMARY_COLUMNS = {
+    "pose_count": "INTEGER NOT NULL DEFAULT 0",
+    "total_seconds": "INTEGER NOT NULL DEFAULT 0",
+    "max_difficulty": "INTEGER NOT NULL DEFAULT 0",
+    "category_mix": "TEXT NOT NULL DEFAULT '{}'",   # JSON {category: pose count}
+}
+
+
+def summary_expressions(table: str, child: str, key: str) -> dict:
+    """The value each summary column should hold, as SQL over {table}.id."""
+    rows = f"FROM {child} c JOIN poses p ON p.id = c.pose_id WHERE c.{key} = {table}.id"
+    return {
+        "pose_count": f"(SELECT COUNT(*) FROM {child} WHERE {key} = {table}.id)",
+        "total_seconds": f"(SELECT COALESCE(SUM(hold_seconds), 0) FROM {child} WHERE {key} = {table}.id)",
+        "max_difficulty": f"(SELECT COALESCE(MAX(p.difficulty), 0) {rows})",
+        "category_mix": f"(SELECT json_group_object(category, n) FROM "
+                        f"(SELECT p.category, COUNT(*) AS n {rows} GROUP BY p.category))",
+    }
+
+
+def summary_sql(table: str, child: str, key: str, where: str = "WHERE id = ?") -> str:
+    """UPDATE recomputing the summary columns; by default for one id."""
+    assignments = ",\n            ".join(
+        f"{column} = {expr}" for column, expr in summary_expressions(table, child, key).items()
+    )
+    return f"""
+        UPDATE {table} SET
+            {assignments}
+        {where}
+    """
+
+
+def _mix_delta(category: str, delta: int) -> str:
+    """category_mix with `category`'s count moved by `delta`, keys kept sorted."""
+    path = f"""'$."' || {category} || '"'"""
+    count = f"(COALESCE(json_extract(category_mix, {path}), 0) + ({delta}))"
+    added = f"json_set(category_mix, {path}, {count})"
+    # Only a new key needs a rebuild, in key order, to match a full recompute
+    return f"""CASE
+                WHEN {count} <= 0 THEN json_remove(category_mix, {path})
+                WHEN json_type(category_mix, {path}) IS NOT NULL THEN {added}
+                ELSE (SELECT json_group_object(key, value)
+                      FROM (SELECT key, value FROM json_each({added}) ORDER BY key))
+            END"""
+
+
+def _summary_delta(table: str, child: str, key: str, row: str, sign: int) -> str:
+    """
+    UPDATE applying one {child} row (NEW or OLD) to its parent's summary:
+    O(categories) instead of a recompute. max_difficulty is only rescanned
+    when the removed row held the maximum and no other row shares it.
+    """
+    difficulty = f"(SELECT difficulty FROM poses WHERE id = {row}.pose_id)"
+    category = f"(SELECT category FROM poses WHERE id = {row}.pose_id)"
+    if sign > 0:
+        max_difficulty = f"MAX(max_difficulty, {difficulty})"
+    else:
+        remaining = f"FROM {child} c JOIN poses p ON p.id = c.pose_id WHERE c.{key} = {table}.id"
+        max_difficulty = f"""CASE
+                WHEN {difficulty} < max_difficulty THEN max_difficulty
+                WHEN EXISTS (SELECT 1 {remaining} AND p.difficulty = max_difficulty) THEN max_difficulty
+                ELSE (SELECT COALESCE(MAX(p.difficulty), 0) {remaining})
+            END"""
+    op = "+" if sign > 0 else "-"
+    return f"""
+        UPDATE {table} SET
+            pose_count = pose_count {op} 1,
+            total_seconds = total_seconds {op} {row}.hold_seconds,
+            max_difficulty = {max_difficulty},
+            category_mix = {_mix_delta(category, sign)}
+        WHERE id = {row}.{key}"""
+
+
+def _create_summary_triggers(conn: sqlite3.Connection, table: str, child: str, key: str):
+    """Keep {table}'s summary columns current on every write to {child}."""
+    for name in (f"{child}_summary_insert", f"{child}_summary_delete",
+                 f"{child}_summary_update", f"poses_{table}_summary_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")   # replace older definitions
+    conn.executescript(f"""
+        CREATE TRIGGER {child}_summary_insert AFTER INSERT ON {child} BEGIN
+            {_summary_delta(table, child, key, "NEW", +1)};
+        END;
+
+        CREATE TRIGGER {child}_summary_delete AFTER DELETE ON {child} BEGIN
+            {_summary_delta(table, child, key, "OLD", -1)};
+        END;
+
+        CREATE TRIGGER {child}_summary_update
+        AFTER UPDATE OF {key}, pose_id, hold_seconds ON {child} BEGIN
+            {_summary_delta(table, child, key, "OLD", -1)};
+            {_summary_delta(table, child, key, "NEW", +1)};
+        END;
+
+        -- Re-seeding can move a pose to another category or difficulty
+        CREATE TRIGGER poses_{table}_summary_update
+        AFTER UPDATE OF category, difficulty ON poses
+        WHEN OLD.category IS NOT NEW.category OR OLD.difficulty IS NOT NEW.difficulty BEGIN
+            {summary_sql(table, child, key, f"WHERE id IN (SELECT {key} FROM {child} WHERE pose_id = NEW.id)")};
+        END;
+    """)
+
+
+def _add_summary_columns(conn: sqlite3.Connection, table: str, child: str, key: str):
+    """Add and backfill summary columns on databases that predate them."""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    missing = [c for c in SUMMARY_COLUMNS if c not in columns]
+    for column in missing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {SUMMARY_COLUMNS[column]}")
+    if missing:
+        conn.execute(summary_sql(table, child, key, where=""))
+
+
+def summary_row(row: sqlite3.Row) -> dict:
+    """A practice or sequence row as a dict, with category_mix decoded."""
+    item = dict(row)
+    if "category_mix" in item:
+        item["category_mix"] = json.loads(item["category_mix"])
+    return item
+
+
+def stale_summaries(conn: sqlite3.Connection, table: str, child: str, key: str) -> list:
+    """Ids of {table} rows whose stored summary disagrees with {child}."""
+    drift = " OR ".join(f"{column} IS NOT {expr}"
+                        for column, expr in summary_expressions(table, child, key).items())
+    return [row[0] for row in conn.execute(f"SELECT id FROM {table} WHERE {drift}")]
+
+
+def refresh_summaries(conn: sqlite3.Connection, table: str, child: str, key: str) -> int:
+    """Recompute every row's summary columns. Returns the rows updated."""
+    return conn.execute(summary_sql(table, child, key, where="")).rowcount
+
+
+def init_db(path: str = None):
     """Create tables if they don't exist."""
-    conn = get_connection()
+    conn = get_connection(path)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS poses (
             id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -46,7 +457,11 @@ def init_db():
             description TEXT,
             style       TEXT,
             difficulty  INTEGER DEFAULT 2,
-            created_at  TEXT DEFAULT (datetime('now'))
+            created_at  TEXT DEFAULT (datetime('now')),
+            pose_count  INTEGER NOT NULL DEFAULT 0,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            max_difficulty INTEGER NOT NULL DEFAULT 0,
+            category_mix TEXT NOT NULL DEFAULT '{}'
         );
 
         CREATE TABLE IF NOT EXISTS sequence_poses (
@@ -61,7 +476,11 @@ def init_db():
         CREATE TABLE IF NOT EXISTS practices (
             id          INTEGER PRIMARY KEY AUTOINCREMENT,
             name        TEXT NOT NULL,
-            created_at  TEXT DEFAULT (datetime('now'))
+            created_at  TEXT DEFAULT (datetime('now')),
+            pose_count  INTEGER NOT NULL DEFAULT 0,
+            total_seconds INTEGER NOT NULL DEFAULT 0,
+            max_difficulty INTEGER NOT NULL DEFAULT 0,
+            category_mix TEXT NOT NULL DEFAULT '{}'
         );
 
         CREATE TABLE IF NOT EXISTS practice_poses (
@@ -75,16 +494,110 @@ def init_db():
 
         CREATE INDEX IF NOT EXISTS idx_poses_category ON poses(category);
         CREATE INDEX IF NOT EXISTS idx_poses_difficulty ON poses(difficulty);
+        CREATE INDEX IF NOT EXISTS idx_poses_listing ON poses(category, difficulty, english_name, id);
         CREATE INDEX IF NOT EXISTS idx_pose_tags_tag ON pose_tags(tag);
         CREATE INDEX IF NOT EXISTS idx_sequence_poses_seq ON sequence_poses(sequence_id);
         CREATE INDEX IF NOT EXISTS idx_practice_poses_prac ON practice_poses(practice_id);
+        CREATE INDEX IF NOT EXISTS idx_sequences_created ON sequences(created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_sequences_style ON sequences(style, created_at, id);
+        CREATE INDEX IF NOT EXISTS idx_practices_created ON practices(created_at, id);
+
+        CREATE TABLE IF NOT EXISTS catalog_meta (
+            key     TEXT PRIMARY KEY,
+            value   TEXT
+        );
+
+        -- Catalog version: bumped on any change to poses or pose_tags,
+        -- drives the in-memory catalog reload and HTTP ETags.
+        INSERT OR IGNORE INTO catalog_meta (key, value) VALUES
+            ('version', 0), ('updated_at', strftime('%s', 'now'));
+
+        -- Full-text search over names, descriptions and tags.
+        -- remove_diacritics folds Sanskrit transliterations (Tāḍāsana → tadasana).
+        CREATE VIRTUAL TABLE IF NOT EXISTS poses_fts USING fts5(
+            english_name, sanskrit_name, description, tags,
+            tokenize = "unicode61 remove_diacritics 2"
+        );
+
+        CREATE TRIGGER IF NOT EXISTS poses_fts_insert AFTER INSERT ON poses BEGIN
+            INSERT INTO poses_fts (rowid, english_name, sanskrit_name, description, tags)
+            VALUES (NEW.id, NEW.english_name, NEW.sanskrit_name, NEW.description, '');
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS poses_fts_update AFTER UPDATE ON poses BEGIN
+            UPDATE poses_fts
+            SET english_name = NEW.english_name, sanskrit_name = NEW.sanskrit_name,
+                description = NEW.description
+            WHERE rowid = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS poses_fts_delete AFTER DELETE ON poses BEGIN
+            DELETE FROM poses_fts WHERE rowid = OLD.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS pose_tags_fts_insert AFTER INSERT ON pose_tags BEGIN
+            UPDATE poses_fts
+            SET tags = (SELECT group_concat(tag, ' ') FROM pose_tags WHERE pose_id = NEW.pose_id)
+            WHERE rowid = NEW.pose_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS pose_tags_fts_delete AFTER DELETE ON pose_tags BEGIN
+            UPDATE poses_fts
+            SET tags = COALESCE((SELECT group_concat(tag, ' ') FROM pose_tags WHERE pose_id = OLD.pose_id), '')
+            WHERE rowid = OLD.pose_id;
+        END;
     """)
+    for table in ("poses", "pose_tags"):
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                AFTER {event} ON {table} BEGIN
+                    UPDATE catalog_meta
+                    SET value = CASE key WHEN 'version' THEN value + 1
+                                         ELSE strftime('%s', 'now') END
+                    WHERE key IN ('version', 'updated_at');
+                END
+            """)
+
+    for table, child, key in SUMMARY_TABLES:
+        _add_summary_columns(conn, table, child, key)
+        _create_summary_triggers(conn, table, child, key)
+
+    # Backfill the search index for databases created before it existed
+    indexed = conn.execute("SELECT COUNT(*) FROM poses_fts").fetchone()[0]
+    total = conn.execute("SELECT COUNT(*) FROM poses").fetchone()[0]
+    if indexed != total:
+        rebuild_search_index(conn)
+
     conn.commit()
     conn.close()
 
 
-def db_is_seeded() -> bool:
-    conn = get_connection()
+def rebuild_search_index(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM poses_fts")
+    conn.execute("""
+        INSERT INTO poses_fts (rowid, english_name, sanskrit_name, description, tags)
+        SELECT p.id, p.english_name, p.sanskrit_name, p.description,
+               COALESCE((SELECT group_concat(tag, ' ') FROM pose_tags WHERE pose_id = p.id), '')
+        FROM poses p
+    """)
+
+
+def db_is_seeded(path: str = None) -> bool:
+    conn = get_connection(path)
     count = conn.execute("SELECT COUNT(*) FROM poses").fetchone()[0]
     conn.close()
     return count > 0
+
+
+def get_meta(conn: sqlite3.Connection, key: str):
+    row = conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(conn: sqlite3.Connection, key: str, value):
+    conn.execute(
+        "INSERT INTO catalog_meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, str(value))
+    )
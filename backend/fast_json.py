@@ -0,0 +1,40 @@
+"""
+fast_json.py — JSON encoding for hot responses.
+Uses orjson when it is installed and falls back to the standard library,
+producing the same compact UTF-8 output either way. Responses built from
+these bytes skip FastAPI's jsonable_encoder entirely.
+"""
+import json
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+if orjson is not None:
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+else:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def join_array(items) -> bytes:
+    """Splice already-encoded JSON values into one array."""
+    return b"[" + b",".join(items) + b"]"
+
+
+def splice(obj: dict, **encoded) -> bytes:
+    """obj as a JSON object with already-encoded members appended."""
+    members = b",".join(b'"%s":%s' % (key.encode(), value) for key, value in encoded.items())
+    body = dumps(obj)
+    return body[:-1] + (b"," if obj and members else b"") + members + b"}"
+
+
+def json_response(data, status_code: int = 200, headers: dict = None) -> Response:
+    """Response for plain JSON-ready data (or pre-encoded bytes)."""
+    body = data if isinstance(data, bytes) else dumps(data)
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,73 @@
+"""
+http_cache.py — Conditional GET support for catalog-backed endpoints.
+Responses carry an ETag derived from the catalog's version and content and
+from the serving code, so browsers and CDNs can revalidate with a cheap
+304 instead of re-downloading, and a deploy never reuses an old tag.
+"""
+import glob
+import hashlib
+import inspect
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Request
+from fastapi.responses import Response
+
+from fast_json import json_response
+
+CATALOG_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=3600"
+
+
+def _code_digest() -> str:
+    """Digest of the backend source, so a deploy that changes a response's shape changes its ETag."""
+    backend = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1()
+    paths = glob.glob(os.path.join(backend, "*.py")) + glob.glob(os.path.join(backend, "routers", "*.py"))
+    for path in sorted(paths):
+        if os.path.basename(path).startswith("test_"):
+            continue
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:8]
+
+
+CODE_DIGEST = _code_digest()
+
+
+def catalog_etag(catalog, salt: str = "") -> str:
+    """Strong ETag for a representation that only changes with the catalog (and the code)."""
+    return f'"c{catalog.version}-{catalog.digest}-{CODE_DIGEST}{"-" + salt if salt else ""}"'
+
+
+def _not_modified(request: Request, etag: str, last_modified: int) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= last_modified
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def catalog_response(request: Request, catalog, build, salt: str = "") -> Response:
+    """
+    Answer a GET from catalog data. `build()` is only called when the
+    client's copy is stale, so a revalidation does no work at all. It may
+    return data to encode or already-encoded JSON bytes, or an awaitable
+    of either.
+    """
+    etag = catalog_etag(catalog, salt)
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if catalog.updated_at:
+        headers["Last-Modified"] = formatdate(catalog.updated_at, usegmt=True)
+
+    if _not_modified(request, etag, catalog.updated_at):
+        return Response(status_code=304, headers=headers)
+    body = build()
+    if inspect.isawaitable(body):
+        body = await body
+    return json_response(body, headers=headers)
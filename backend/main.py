@@ -3,9 +3,8 @@ main.py — Asana Studio FastAPI application.
 Serves API + static frontend files.
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import sys
@@ -13,20 +12,25 @@ import sys
 # Ensure backend is importable
 sys.path.insert(0, os.path.dirname(__file__))
 
-from database import init_db, db_is_seeded
-from routers import poses, sequences, practices
+from database import close_pool, read_connection, pool_stats, executor_stats, run_in_db, PoolTimeout
+from catalog import load_catalog, get_catalog
+from transitions import transition_graph
+import metrics
+from static_assets import ASSET_DIRS, asset_response, get_bundle
+from routers import poses, sequences, practices, library
 
 FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend")
 
 
 @asynccontextmanager
 async def lifespan(app):
-    """Initialize database and seed if needed."""
-    init_db()
-    if not db_is_seeded():
-        from seed_poses import seed_database
-        seed_database()
+    """Initialize database, seed if needed, load the pose catalog and frontend assets."""
+    from seed_poses import ensure_seeded
+    ensure_seeded()
+    transition_graph(load_catalog())
+    get_bundle(FRONTEND_DIR)
     yield
+    close_pool()
 
 
 app = FastAPI(
@@ -36,6 +40,8 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(metrics.MetricsMiddleware)
+
 # CORS for local development
 app.add_middleware(
     CORSMiddleware,
@@ -44,27 +50,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(PoolTimeout)
+def pool_timeout_handler(request, exc):
+    return JSONResponse({"detail": "Database busy, try again"}, status_code=503)
+
+
 # Register API routers
 app.include_router(poses.router)
 app.include_router(sequences.router)
 app.include_router(practices.router)
+app.include_router(library.router)
+
+metrics.register_gauges("asana_db_pool", pool_stats, "SQLite connection pool state.")
+metrics.register_gauges("asana_db_executor", executor_stats, "Async database executor queue.")
+metrics.register_gauges("asana_pose_list_cache", poses.list_cache.stats, "list_poses response cache.")
+metrics.register_gauges(
+    "asana_catalog",
+    lambda: {"version": get_catalog().version, "poses": len(get_catalog())},
+    "In-memory pose catalog.",
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# Serve frontend static files: fingerprinted + precompressed (see static_assets.py)
+async def serve_asset(request: Request, name: str):
+    asset = get_bundle(FRONTEND_DIR).assets.get(request.url.path)
+    if asset is None:
+        raise HTTPException(404, "Not found")
+    return asset_response(request, asset)
+
+
+for subdir in ASSET_DIRS:
+    app.add_api_route(f"/{subdir}/{{name:path}}", serve_asset, methods=["GET"], include_in_schema=False)
+
 
-# Serve frontend static files
-for subdir in ("css", "js", "assets"):
-    dirpath = os.path.join(FRONTEND_DIR, subdir)
-    if os.path.isdir(dirpath):
-        app.mount(f"/{subdir}", StaticFiles(directory=dirpath), name=subdir)
+@app.get("/", include_in_schema=False)
+async def serve_index(request: Request):
+    index = get_bundle(FRONTEND_DIR).index
+    if index is None:
+        raise HTTPException(404, "Not found")
+    return asset_response(request, index)
 
 
-@app.get("/")
-def serve_index():
-    return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
+def _pose_count() -> int:
+    with read_connection() as conn, metrics.timed_query("health"):
+        return conn.execute("SELECT COUNT(*) FROM poses").fetchone()[0]
 
 
 @app.get("/health")
-def health():
-    from database import get_connection
-    conn = get_connection()
-    count = conn.execute("SELECT COUNT(*) FROM poses").fetchone()[0]
-    conn.close()
-    return {"status": "healthy", "poses_count": count}
+async def health():
+    return {
+        "status": "healthy",
+        "poses_count": await run_in_db(_pose_count),
+        "db_pool": pool_stats(),
+        "db_executor": executor_stats(),
+        "pose_list_cache": poses.list_cache.stats(),
+    }
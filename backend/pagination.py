@@ -0,0 +1,61 @@
+"""
+pagination.py — Opaque keyset cursors shared by the list endpoints.
+A cursor is the last row's sort key, JSON-encoded and base64'd, so the
+next page is an index seek rather than an OFFSET scan.
+"""
+import base64
+import json
+
+from fastapi import HTTPException
+
+
+def encode_cursor(position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """The position inside a cursor; 400 if it isn't one of ours."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        position = None
+    if not isinstance(position, list) or not position:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
+
+
+def like_prefix(text: str) -> str:
+    """LIKE pattern matching values that start with `text` (use ESCAPE '\\')."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def newest_first(conn, table: str, columns: str, where: list, params: list,
+                 per_page: int, cursor: str = None):
+    """
+    One page of `table` ordered by (created_at, id) descending, using the
+    table's created_at index. `where` holds SQL conditions joined with AND.
+    Returns (rows, next_cursor).
+    """
+    where = list(where)
+    params = list(params)
+    if cursor:
+        position = decode_cursor(cursor)
+        # (created_at text, id); type() also rules out bools
+        if len(position) != 3 or position[0] != "t" or type(position[1]) is not str \
+                or type(position[2]) is not int:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        where.append("(created_at, id) < (?, ?)")
+        params += position[1:]
+
+    rows = conn.execute(
+        f"SELECT {columns} FROM {table}"
+        + (f" WHERE {' AND '.join(where)}" if where else "")
+        + " ORDER BY created_at DESC, id DESC LIMIT ?",
+        (*params, per_page + 1),
+    ).fetchall()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(["t", rows[-1]["created_at"], rows[-1]["id"]])
+    return rows, next_cursor
@@ -0,0 +1,286 @@
+"""
+routers/library.py — Bulk export and import of saved sequences and practices.
+Export streams NDJSON, CSV or plain text in id order, a batch of items at
+a time, so memory stays flat and the first bytes go out after one query.
+Import takes NDJSON (the export format) or a JSON array, validates every
+record up front and writes the valid ones in one transaction.
+"""
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Literal, Optional
+from collections import defaultdict
+import csv
+import io
+import json
+import time
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from catalog import get_catalog_async
+from database import SUMMARY_TABLES, read_connection, write_connection, run_in_db, summary_row
+from fast_json import dumps
+from metrics import timed_query
+
+router = APIRouter(prefix="/api/library", tags=["library"])
+
+EXPORT_BATCH = 500   # items (with all their pose rows) per query
+# table → (kind, child table, foreign key, columns)
+SOURCES = {
+    "sequences": ("sequence", "sequence_poses", "sequence_id",
+                  "id, name, description, style, difficulty, created_at, "
+                  "pose_count, total_seconds, max_difficulty, category_mix"),
+    "practices": ("practice", "practice_poses", "practice_id",
+                  "id, name, created_at, pose_count, total_seconds, max_difficulty, category_mix"),
+}
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "text": "text/plain; charset=utf-8",
+}
+MAX_IMPORT_RECORDS = 100_000
+IMPORT_BATCH = 1_000   # items per executemany round
+MAX_REPORTED_ERRORS = 100
+CSV_COLUMNS = ("kind", "item_id", "item_name", "style", "difficulty", "created_at",
+               "position", "pose_id", "english_name", "sanskrit_name", "category",
+               "side", "hold_seconds")
+
+
+def item_text(item: dict) -> str:
+    """A sequence or practice as a readable cue sheet."""
+    lines = [f"# {item['name']}"]
+    if "style" in item:
+        lines += [f"Style: {item['style']}", f"Difficulty: {item['difficulty']}"]
+    lines.append("")
+    for p in item["poses"]:
+        side_str = f" ({p['side']})" if p["side"] != "both" else ""
+        lines.append(f"{p['position']}. {p['english_name']}{side_str} — {p['hold_seconds']}s")
+    return "\n".join(lines)
+
+
+def _fetch_batch(table: str, after_id: int, limit: int) -> list:
+    """The next `limit` items with id > after_id, each with its pose rows."""
+    _, child, key, columns = SOURCES[table]
+    with read_connection() as conn, timed_query(f"export_{table}"):
+        items = conn.execute(
+            f"SELECT {columns} FROM {table} WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+        ).fetchall()
+        if not items:
+            return []
+        rows = conn.execute(f"""
+            SELECT c.{key} AS item_id, c.position, c.pose_id, c.side, c.hold_seconds,
+                   p.english_name, p.sanskrit_name, p.category
+            FROM {child} c
+            JOIN poses p ON p.id = c.pose_id
+            WHERE c.{key} BETWEEN ? AND ?
+            ORDER BY c.{key}, c.position
+        """, (items[0]["id"], items[-1]["id"])).fetchall()
+
+    poses = defaultdict(list)
+    for row in rows:
+        pose = dict(row)
+        poses[pose.pop("item_id")].append(pose)
+    batch = []
+    for row in items:
+        item = summary_row(row)
+        item["poses"] = poses.get(item["id"], [])
+        batch.append(item)
+    return batch
+
+
+def _ndjson(kind: str, batch: list) -> bytes:
+    return b"".join(dumps({"kind": kind, **item}) + b"\n" for item in batch)
+
+
+def _csv(kind: str, batch: list) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for item in batch:
+        head = (kind, item["id"], item["name"], item.get("style"), item.get("difficulty"), item["created_at"])
+        if not item["poses"]:
+            # Keep empty items, with blank pose columns
+            writer.writerow((*head, *[""] * (len(CSV_COLUMNS) - len(head))))
+            continue
+        writer.writerows(
+            (*head, p["position"], p["pose_id"], p["english_name"], p["sanskrit_name"],
+             p["category"], p["side"], p["hold_seconds"])
+            for p in item["poses"]
+        )
+    return out.getvalue().encode()
+
+
+def _text(kind: str, batch: list) -> bytes:
+    return "".join(item_text(item) + "\n\n" for item in batch).encode()
+
+
+FORMATTERS = {"ndjson": _ndjson, "csv": _csv, "text": _text}
+
+
+async def _stream(tables, format: str, batch_size: int = EXPORT_BATCH):
+    if format == "csv":
+        out = io.StringIO()
+        csv.writer(out).writerow(CSV_COLUMNS)
+        yield out.getvalue().encode()
+    for table in tables:
+        kind = SOURCES[table][0]
+        after_id = 0
+        while True:
+            batch = await run_in_db(_fetch_batch, table, after_id, batch_size)
+            if not batch:
+                break
+            yield FORMATTERS[format](kind, batch)
+            after_id = batch[-1]["id"]
+
+
+@router.get("/export")
+async def export_library(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|text)$"),
+    kind: str = Query("all", pattern="^(all|sequences|practices)$"),
+):
+    """
+    Every saved sequence and/or practice with its poses. NDJSON has one
+    item per line; CSV has one row per pose, with the item's fields repeated
+    (or a single row with blank pose columns for an item without poses).
+    """
+    tables = ("sequences", "practices") if kind == "all" else (kind,)
+    extension = "txt" if format == "text" else format
+    return StreamingResponse(
+        _stream(tables, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="asana-library.{extension}"'},
+    )
+
+
+class ImportPose(BaseModel):
+    pose_id: int
+    position: Optional[int] = None   # defaults to list order
+    side: Literal["both", "left", "right"] = "both"
+    hold_seconds: int = Field(30, ge=1, le=3600)
+
+
+class ImportItem(BaseModel):
+    """One exported item; ids, summaries and other extra fields are ignored."""
+    kind: Literal["sequence", "practice"]
+    name: str = Field(min_length=1, max_length=200)
+    description: Optional[str] = None
+    style: Optional[str] = None
+    difficulty: int = Field(3, ge=1, le=5)
+    created_at: Optional[str] = Field(None, pattern=r"^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}:\d{2})?$")
+    poses: List[ImportPose] = []
+
+
+def _error_messages(exc: ValidationError) -> list:
+    return [f"{'.'.join(map(str, e['loc'])) or 'record'}: {e['msg']}" for e in exc.errors()]
+
+
+def _validate_import(body: bytes, catalog) -> tuple:
+    """
+    Parse and check every record against the catalog's pose ids.
+    Returns (valid items, errors); records are numbered from 1, by line
+    for NDJSON and by position for a JSON array.
+    """
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(400, "Import body must be UTF-8")
+    if text.lstrip().startswith("["):
+        try:
+            records = list(enumerate(json.loads(text), 1))
+        except ValueError as e:
+            raise HTTPException(400, f"Invalid JSON array: {e}")
+    else:
+        records = [(n, line) for n, line in enumerate(text.splitlines(), 1) if line.strip()]
+    if len(records) > MAX_IMPORT_RECORDS:
+        raise HTTPException(400, f"An import can hold at most {MAX_IMPORT_RECORDS} records")
+
+    valid, errors = [], []
+    for n, record in records:
+        try:
+            if isinstance(record, str):
+                item = ImportItem.model_validate_json(record)
+            else:
+                item = ImportItem.model_validate(record)
+        except ValidationError as e:   # includes malformed JSON lines
+            errors.append({"record": n, "errors": _error_messages(e)})
+            continue
+        unknown = sorted({p.pose_id for p in item.poses if p.pose_id not in catalog.by_id})
+        if unknown:
+            errors.append({"record": n, "errors": [f"poses: unknown pose_id {i}" for i in unknown]})
+            continue
+        valid.append(item)
+    return valid, errors
+
+
+def _next_id(conn, table: str) -> int:
+    """First id AUTOINCREMENT would hand out next."""
+    return conn.execute(f"""
+        SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+                   COALESCE((SELECT MAX(id) FROM {table}), 0)) + 1
+    """, (table,)).fetchone()[0]
+
+
+PARENT_SQL = {
+    "sequences": "INSERT INTO sequences (id, name, description, style, difficulty, created_at) "
+                 "VALUES (?, ?, ?, ?, ?, COALESCE(?, datetime('now')))",
+    "practices": "INSERT INTO practices (id, name, created_at) VALUES (?, ?, COALESCE(?, datetime('now')))",
+}
+
+
+def _insert_items(items: list) -> dict:
+    """
+    Write items in one transaction, IMPORT_BATCH at a time: parents, then
+    their pose rows, whose summary triggers fill in the parents' summaries.
+    """
+    imported = {}
+    with write_connection() as conn, timed_query("import_library"):
+        for table, child, key in SUMMARY_TABLES:
+            kind = SOURCES[table][0]
+            group = [item for item in items if item.kind == kind]
+            next_id = _next_id(conn, table)
+            for start in range(0, len(group), IMPORT_BATCH):
+                parents, children = [], []
+                for item in group[start:start + IMPORT_BATCH]:
+                    if table == "sequences":
+                        parents.append((next_id, item.name, item.description, item.style,
+                                        item.difficulty, item.created_at))
+                    else:
+                        parents.append((next_id, item.name, item.created_at))
+                    children.extend(
+                        (next_id, p.pose_id, i if p.position is None else p.position, p.side, p.hold_seconds)
+                        for i, p in enumerate(item.poses, 1)
+                    )
+                    next_id += 1
+                conn.executemany(PARENT_SQL[table], parents)
+                conn.executemany(
+                    f"INSERT INTO {child} ({key}, pose_id, position, side, hold_seconds) VALUES (?, ?, ?, ?, ?)",
+                    children,
+                )
+            imported[table] = len(group)
+    return imported
+
+
+@router.post("/import")
+async def import_library(request: Request, dry_run: bool = False):
+    """
+    Import sequences and practices from NDJSON or a JSON array of records
+    shaped like the export's. Invalid records are reported and skipped;
+    the valid ones are committed together.
+    """
+    start = time.perf_counter()
+    body = await request.body()
+    catalog = await get_catalog_async()
+    items, errors = await run_in_threadpool(_validate_import, body, catalog)
+    imported = {"sequences": 0, "practices": 0}
+    if items and not dry_run:
+        imported = await run_in_db(_insert_items, items)
+    elapsed = time.perf_counter() - start
+    records = len(items) + len(errors)
+    return {
+        "imported": imported,
+        "valid": len(items),
+        "failed": len(errors),
+        "errors": errors[:MAX_REPORTED_ERRORS],
+        "dry_run": dry_run,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(records / elapsed) if elapsed > 0 else None,
+    }
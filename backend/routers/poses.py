@@ -1,137 +1,331 @@
 """
 routers/poses.py — Search/browse yoga poses.
+Served from the in-memory catalog; only text search and cache misses
+leave the event loop.
 """
-from fastapi import APIRouter, Query
-from typing import Optional
-import sqlite3
+from fastapi import APIRouter, Query, HTTPException, Request
+from typing import List, NamedTuple, Optional
+from bisect import bisect_right
+from itertools import islice
+import hashlib
+import re
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from database import get_connection
+from catalog import bitset, get_catalog_async
+from database import read_connection, run_in_db
+from http_cache import catalog_response
+from cache import ResponseCache
+from fast_json import join_array, splice
+from metrics import timed_query
+from pagination import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/api/poses", tags=["poses"])
 
+# bm25 column weights: english_name, sanskrit_name, description, tags
+SEARCH_WEIGHTS = (10.0, 8.0, 1.0, 4.0)
+MAX_SEARCH_TERMS = 8
+MAX_CACHED_SEARCHES = 256
+MAX_BATCH_IDS = 200
+
+# Encoded list_poses responses, keyed on normalized params + catalog version
+list_cache = ResponseCache(
+    max_bytes=int(os.environ.get("ASANA_POSE_CACHE_BYTES", str(8 * 1024 * 1024))),
+    ttl=float(os.environ.get("ASANA_POSE_CACHE_TTL", "0")),
+)
+
+
+def _fts_query(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 prefix query: `war ii` → `"war"* "ii"*`."""
+    terms = re.findall(r"\w+", q)[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def _search_ids(q: str) -> list:
+    """Pose ids matching q, best bm25 match first."""
+    match = _fts_query(q)
+    if match is None:
+        return []
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    with read_connection() as conn, timed_query("search_poses"):
+        rows = conn.execute(
+            f"SELECT rowid FROM poses_fts WHERE poses_fts MATCH ? ORDER BY bm25(poses_fts, {weights})",
+            (match,)
+        ).fetchall()
+    return [r[0] for r in rows]
+
+
+class PoseFilter(NamedTuple):
+    """Normalized list filters; part of the response cache key."""
+    q: Optional[str] = None
+    category: Optional[str] = None
+    difficulty: Optional[int] = None
+    tags_all: tuple = ()
+    tags_any: tuple = ()
+    tags_none: tuple = ()
+    bilateral_only: Optional[bool] = None
+
+    def matches(self, p) -> bool:
+        return (
+            (not self.category or p.category == self.category)
+            and (not self.difficulty or p.difficulty == self.difficulty)
+            and all(t in p.tags for t in self.tags_all)
+            and (not self.tags_any or any(t in p.tags for t in self.tags_any))
+            and not any(t in p.tags for t in self.tags_none)
+            and (self.bilateral_only is None or p.is_bilateral == int(self.bilateral_only))
+        )
+
+    def bits(self, catalog) -> int:
+        """Matching ordinals (ignoring q) as a bitset over the catalog."""
+        bits = catalog.all_bits
+        if self.category:
+            bits &= catalog.category_bits.get(self.category, 0)
+        if self.difficulty:
+            bits &= catalog.difficulty_bits.get(self.difficulty, 0)
+        for tag in self.tags_all:
+            bits &= catalog.tag_bits.get(tag, 0)
+        if self.tags_any:
+            any_bits = 0
+            for tag in self.tags_any:
+                any_bits |= catalog.tag_bits.get(tag, 0)
+            bits &= any_bits
+        for tag in self.tags_none:
+            bits &= ~catalog.tag_bits.get(tag, 0)
+        if self.bilateral_only is not None:
+            bits &= catalog.bilateral_bits if self.bilateral_only else ~catalog.bilateral_bits
+        return bits
+
+
+def _tag_set(*values) -> tuple:
+    """Repeated and/or comma-separated tag params as a sorted, deduplicated tuple."""
+    tags = set()
+    for value in values:
+        for item in value or ():
+            tags.update(t.strip() for t in item.split(",") if t.strip())
+    return tuple(sorted(tags))
+
+
+def _iter_poses(catalog, f: PoseFilter, after=None):
+    """
+    Lazily yield matching poses in listing order.
+
+    Without a search term this combines the catalog's bitsets and walks
+    the result from just past the `after` sort key, so a page costs the
+    same at any depth. With a search term results come back in relevance
+    order instead.
+    """
+    if f.q:
+        ranked = (catalog.by_id[i] for i in _search_ids(f.q) if i in catalog.by_id)
+        return (p for p in ranked if f.matches(p))
+
+    start = bisect_right(catalog.sort_keys, after) if after else 0
+    return catalog.select(f.bits(catalog), start)
+
+
+def _search_bits(catalog, q: str) -> int:
+    """Every pose matching q as a bitset, memoized per catalog snapshot."""
+    bits = catalog.search_matches.get(q)
+    if bits is None:
+        if len(catalog.search_matches) >= MAX_CACHED_SEARCHES:
+            catalog.search_matches.clear()
+        by_id = catalog.by_id
+        bits = catalog.search_matches[q] = bitset(
+            (by_id[i].ordinal for i in _search_ids(q) if i in by_id), len(catalog)
+        )
+    return bits
+
+
+def _match_bits(catalog, f: PoseFilter) -> int:
+    bits = f.bits(catalog)
+    if f.q:
+        bits &= _search_bits(catalog, f.q)
+    return bits
+
+
+def _count_poses(catalog, f: PoseFilter) -> int:
+    return _match_bits(catalog, f).bit_count()
+
+
+def _facets(catalog, f: PoseFilter) -> dict:
+    """
+    Category, difficulty, tag and bilateral counts over the current matches.
+    Each facet ignores the filter on its own field, so the counts say what
+    choosing another value would return. Cost is one AND + popcount per
+    facet value, independent of how many poses match.
+    """
+    def counts(index, **without):
+        base = _match_bits(catalog, f._replace(**without))
+        return {value: n for value, bits in index.items() if (n := (base & bits).bit_count())}
+
+    categories = counts(catalog.category_bits, category=None)
+    difficulties = counts(catalog.difficulty_bits, difficulty=None)
+    tags = counts(catalog.tag_bits, tags_all=(), tags_any=(), tags_none=())
+    sided = _match_bits(catalog, f._replace(bilateral_only=None))
+    bilateral = (sided & catalog.bilateral_bits).bit_count()
+    return {
+        "category": [{"category": c, "count": n} for c, n in sorted(categories.items())],
+        "difficulty": [{"difficulty": d, "count": n} for d, n in sorted(difficulties.items())],
+        "tag": [{"tag": t, "count": n} for t, n in sorted(tags.items(), key=lambda kv: (-kv[1], kv[0]))],
+        "bilateral": {"bilateral": bilateral, "unilateral": sided.bit_count() - bilateral},
+    }
+
+
+def _decode_cursor(cursor: str, searching: bool):
+    """Keyset cursors hold the last (category, difficulty, english_name, id);
+    search cursors hold a match offset, since bm25 rank isn't a stable key."""
+    position = decode_cursor(cursor)
+    try:
+        if searching:
+            kind, offset = position
+            if kind == "r" and type(offset) is int and offset >= 0:
+                return offset
+        else:
+            kind, category, difficulty, name, pose_id = position
+            # Must compare against sort_keys; type() also rules out bools
+            if (kind == "k" and type(category) is str and type(difficulty) is int
+                    and type(name) is str and type(pose_id) is int):
+                return (category, difficulty, name, pose_id)
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _list_page(catalog, f: PoseFilter, page, per_page, cursor, include_total, facets=False) -> bytes:
+    """One encoded page: the metadata plus each pose's cached JSON fragment."""
+    offset = None
+    if cursor and not f.q:
+        matches = _iter_poses(catalog, f, after=_decode_cursor(cursor, searching=False))
+    else:
+        offset = _decode_cursor(cursor, searching=True) if cursor else (page - 1) * per_page
+        matches = islice(_iter_poses(catalog, f), offset, None)
+
+    window = list(islice(matches, per_page + 1))
+    poses = window[:per_page]
+    next_cursor = None
+    if len(window) > per_page:
+        if offset is not None and f.q:
+            next_cursor = encode_cursor(["r", offset + per_page])
+        else:
+            next_cursor = encode_cursor(["k", *catalog.sort_keys[poses[-1].ordinal]])
+
+    total = _count_poses(catalog, f) if include_total else None
+    meta = {
+        "total": total,
+        "page": None if cursor else page,
+        "per_page": per_page,
+        "pages": (total + per_page - 1) // per_page if total is not None else None,
+        "next_cursor": next_cursor,
+    }
+    if facets:
+        meta["facets"] = _facets(catalog, f)
+    return splice(meta, poses=join_array(map(catalog.pose_json, poses)))
+
 
 @router.get("")
-def list_poses(
-    q: Optional[str] = Query(None, description="Search english/sanskrit name"),
+async def list_poses(
+    request: Request,
+    q: Optional[str] = Query(None, description="Prefix search over names, description and tags"),
     category: Optional[str] = Query(None),
     difficulty: Optional[int] = Query(None, ge=1, le=5),
-    tag: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None, description="Shorthand for a single tags_all entry"),
+    tags_all: Optional[List[str]] = Query(None, description="Poses must have every one of these tags"),
+    tags_any: Optional[List[str]] = Query(None, description="Poses must have at least one of these tags"),
+    tags_none: Optional[List[str]] = Query(None, description="Poses must have none of these tags"),
     bilateral_only: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    include_total: bool = Query(True, description="Set false to skip counting all matches"),
+    facets: bool = Query(False, description="Include category/difficulty/tag/bilateral counts"),
 ):
-    """List poses with optional filters."""
-    conn = get_connection()
-    conditions = []
-    params = []
-
-    if q:
-        conditions.append("(p.english_name LIKE ? OR p.sanskrit_name LIKE ?)")
-        params.extend([f"%{q}%", f"%{q}%"])
-
-    if category:
-        conditions.append("p.category = ?")
-        params.append(category)
-
-    if difficulty:
-        conditions.append("p.difficulty = ?")
-        params.append(difficulty)
-
-    if bilateral_only is not None:
-        conditions.append("p.is_bilateral = ?")
-        params.append(int(bilateral_only))
-
-    if tag:
-        conditions.append("p.id IN (SELECT pose_id FROM pose_tags WHERE tag = ?)")
-        params.append(tag)
-
-    where = "WHERE " + " AND ".join(conditions) if conditions else ""
-    offset = (page - 1) * per_page
-
-    # Get total count
-    count_sql = f"SELECT COUNT(*) FROM poses p {where}"
-    total = conn.execute(count_sql, params).fetchone()[0]
-
-    # Get poses
-    sql = f"""
-        SELECT p.*, GROUP_CONCAT(DISTINCT pt.tag) as tags
-        FROM poses p
-        LEFT JOIN pose_tags pt ON pt.pose_id = p.id
-        {where}
-        GROUP BY p.id
-        ORDER BY p.category, p.difficulty, p.english_name
-        LIMIT ? OFFSET ?
     """
-    rows = conn.execute(sql, params + [per_page, offset]).fetchall()
+    List poses with optional filters. Tag lists may be repeated params
+    or comma-separated. Pages by `page` or, for infinite scroll, by the returned `next_cursor`.
+    """
+    catalog = await get_catalog_async()
+    q = " ".join(q.lower().split()) if q else ""  # normalized so equivalent searches share a cache key
+    f = PoseFilter(
+        q or None, category, difficulty,
+        tags_all=_tag_set([tag] if tag else None, tags_all),
+        tags_any=_tag_set(tags_any),
+        tags_none=_tag_set(tags_none),
+        bilateral_only=bilateral_only,
+    )
+    key = (catalog.version, f, None if cursor else page, per_page, cursor, include_total, facets)
 
-    poses = []
-    for row in rows:
-        pose = dict(row)
-        pose["tags"] = pose["tags"].split(",") if pose["tags"] else []
-        poses.append(pose)
+    async def build():
+        body = list_cache.get(key)
+        if body is None:
+            # Misses filter, count and maybe search: keep that off the event loop
+            body = await run_in_db(list_cache.get_or_compute, key, lambda: _list_page(
+                catalog, f, page, per_page, cursor, include_total, facets
+            ))
+        return body
 
-    conn.close()
-    return {
-        "total": total,
-        "page": page,
-        "per_page": per_page,
-        "pages": (total + per_page - 1) // per_page,
-        "poses": poses,
-    }
+    return await catalog_response(request, catalog, build)
 
 
 @router.get("/categories")
-def list_categories():
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT category, COUNT(*) as count FROM poses GROUP BY category ORDER BY category"
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+async def list_categories(request: Request):
+    catalog = await get_catalog_async()
+    return await catalog_response(
+        request, catalog, lambda: catalog.encoded("categories", lambda: catalog.category_counts)
+    )
 
 
 @router.get("/tags")
-def list_tags():
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT tag, COUNT(*) as count FROM pose_tags GROUP BY tag ORDER BY count DESC"
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+async def list_tags(request: Request):
+    catalog = await get_catalog_async()
+    return await catalog_response(
+        request, catalog, lambda: catalog.encoded("tags", lambda: catalog.tag_counts)
+    )
+
+
+def _pose_ids(values) -> list:
+    """Repeated and/or comma-separated ids, deduplicated in request order."""
+    ids = {}
+    for value in values:
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            try:
+                ids[int(item)] = None
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid pose id: {item!r}")
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return list(ids)
+
+
+@router.get("/batch")
+async def get_poses_batch(
+    request: Request,
+    ids: List[str] = Query(..., description="Pose ids, repeated and/or comma-separated"),
+):
+    """
+    Many poses, each exactly as GET /api/poses/{id} returns it, in request
+    order. Unknown ids are listed under `missing` rather than failing.
+    """
+    wanted = _pose_ids(ids)
+    catalog = await get_catalog_async()
+    salt = hashlib.sha1(",".join(map(str, wanted)).encode()).hexdigest()[:16]
+
+    def build():
+        found = [catalog.by_id[i] for i in wanted if i in catalog.by_id]
+        missing = [i for i in wanted if i not in catalog.by_id]
+        return splice({"missing": missing}, poses=join_array(map(catalog.detail_json, found)))
+
+    return await catalog_response(request, catalog, build, salt=f"b{salt}")
 
 
 @router.get("/{pose_id}")
-def get_pose(pose_id: int):
-    conn = get_connection()
-    row = conn.execute("SELECT * FROM poses WHERE id = ?", (pose_id,)).fetchone()
-    if not row:
-        conn.close()
-        from fastapi import HTTPException
+async def get_pose(pose_id: int, request: Request):
+    catalog = await get_catalog_async()
+    record = catalog.by_id.get(pose_id)
+    if not record:
         raise HTTPException(status_code=404, detail="Pose not found")
-
-    pose = dict(row)
-
-    # Get tags
-    tags = conn.execute(
-        "SELECT tag FROM pose_tags WHERE pose_id = ?", (pose_id,)
-    ).fetchall()
-    pose["tags"] = [t["tag"] for t in tags]
-
-    # Get variations (children)
-    variations = conn.execute(
-        "SELECT id, english_name, sanskrit_name, slug, difficulty FROM poses WHERE parent_pose_id = ?",
-        (pose_id,)
-    ).fetchall()
-    pose["variations"] = [dict(v) for v in variations]
-
-    # Get parent if exists
-    if pose.get("parent_pose_id"):
-        parent = conn.execute(
-            "SELECT id, english_name, sanskrit_name FROM poses WHERE id = ?",
-            (pose["parent_pose_id"],)
-        ).fetchone()
-        pose["parent"] = dict(parent) if parent else None
-
-    conn.close()
-    return pose
+    return await catalog_response(
+        request, catalog, lambda: catalog.detail_json(record)
+    )
@@ -2,12 +2,18 @@
 routers/practices.py — Custom practice builder CRUD.
 Users can create, update, and delete their own practice sequences.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
+from collections import defaultdict, deque
+import sqlite3
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from database import get_connection
+from database import read_connection, write_connection, run_in_db, summary_row
+from catalog import embed_pose_details, get_catalog_async
+from metrics import timed_query
+from fast_json import json_response
+from pagination import like_prefix, newest_first
 
 router = APIRouter(prefix="/api/practices", tags=["practices"])
 
@@ -19,110 +25,194 @@ class PracticeCreate(BaseModel):
 
 class PracticeUpdate(BaseModel):
     name: Optional[str] = None
-    poses: Optional[list] = None
+    poses: Optional[list] = None  # as above; include a row's `id` to pin the match
+
+
+INSERT_POSE_SQL = (
+    "INSERT INTO practice_poses (practice_id, pose_id, position, side, hold_seconds) VALUES (?,?,?,?,?)"
+)
+LIST_COLUMNS = "id, name, created_at, pose_count, total_seconds, max_difficulty, category_mix"
+
+
+def _pose_row(practice_id, p):
+    return (practice_id, p["pose_id"], p["position"], p.get("side", "both"), p.get("hold_seconds", 30))
+
+
+def _diff_poses(stored, incoming):
+    """
+    Work out the minimal edit from the stored practice_poses rows to the
+    incoming list. Incoming entries match stored rows by explicit `id`,
+    otherwise by (pose_id, side) in position order. Returns (inserts,
+    updates, deletes, counts).
+    """
+    by_id = {row["id"]: row for row in stored}
+    buckets = defaultdict(deque)
+    for row in stored:
+        buckets[row["pose_id"], row["side"]].append(row)
+
+    matched = {}
+    unmatched = []
+    for p in incoming:
+        row = by_id.get(p.get("id"))
+        if row is not None and row["id"] not in matched:
+            matched[row["id"]] = p
+        else:
+            unmatched.append(p)
+
+    inserts = []
+    for p in unmatched:
+        bucket = buckets[p["pose_id"], p.get("side", "both")]
+        while bucket and bucket[0]["id"] in matched:
+            bucket.popleft()
+        if bucket:
+            matched[bucket.popleft()["id"]] = p
+        else:
+            inserts.append(p)
+
+    counts = {"inserted": len(inserts), "removed": 0, "moved": 0, "changed": 0}
+    updates = []
+    for row_id, p in matched.items():
+        row = by_id[row_id]
+        new = (p["pose_id"], p.get("side", "both"), p.get("hold_seconds", 30))
+        moved = row["position"] != p["position"]
+        changed = (row["pose_id"], row["side"], row["hold_seconds"]) != new
+        if moved or changed:
+            updates.append((p["position"], *new, row_id))
+            counts["moved"] += moved
+            counts["changed"] += changed
+
+    deletes = [(row_id,) for row_id in by_id if row_id not in matched]
+    counts["removed"] = len(deletes)
+    return inserts, updates, deletes, counts
+
+
+def _write_poses(conn, sql: str, rows):
+    """executemany for pose rows; an unknown pose_id or missing field is the client's error."""
+    try:
+        conn.executemany(sql, rows)
+    except sqlite3.IntegrityError as e:
+        # Raising inside write_connection() rolls the whole write back
+        raise HTTPException(400, f"Invalid poses: {e}")
+
+
+def _insert_practice(req: PracticeCreate) -> int:
+    with write_connection() as conn, timed_query("create_practice"):
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO practices (name) VALUES (?)", (req.name,))
+        practice_id = cursor.lastrowid
+        _write_poses(conn, INSERT_POSE_SQL, (_pose_row(practice_id, p) for p in req.poses))
+    return practice_id
 
 
 @router.post("")
-def create_practice(req: PracticeCreate):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO practices (name) VALUES (?)", (req.name,))
-    practice_id = cursor.lastrowid
-
-    for p in req.poses:
-        cursor.execute(
-            "INSERT INTO practice_poses (practice_id, pose_id, position, side, hold_seconds) VALUES (?,?,?,?,?)",
-            (practice_id, p["pose_id"], p["position"],
-             p.get("side", "both"), p.get("hold_seconds", 30))
-        )
-
-    conn.commit()
-    conn.close()
+async def create_practice(req: PracticeCreate):
+    practice_id = await run_in_db(_insert_practice, req)
     return {"id": practice_id, "message": "Practice created"}
 
 
-@router.get("")
-def list_practices():
-    conn = get_connection()
-    rows = conn.execute("""
-        SELECT p.*, COUNT(pp.id) as pose_count,
-               SUM(pp.hold_seconds) as total_seconds
-        FROM practices p
-        LEFT JOIN practice_poses pp ON pp.practice_id = p.id
-        GROUP BY p.id
-        ORDER BY p.created_at DESC
-    """).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+def _list_practices(per_page: int, cursor: Optional[str], name: Optional[str]) -> dict:
+    where, params = [], []
+    if name:
+        where.append("name LIKE ? ESCAPE '\\'")
+        params.append(like_prefix(name))
+    with read_connection() as conn, timed_query("list_practices"):
+        rows, next_cursor = newest_first(conn, "practices", LIST_COLUMNS, where, params, per_page, cursor)
+    return {"practices": [summary_row(r) for r in rows], "next_cursor": next_cursor}
 
 
-@router.get("/{practice_id}")
-def get_practice(practice_id: int):
-    conn = get_connection()
-    practice = conn.execute(
-        "SELECT * FROM practices WHERE id = ?", (practice_id,)
-    ).fetchone()
-    if not practice:
-        conn.close()
-        raise HTTPException(404, "Practice not found")
-
-    poses = conn.execute("""
-        SELECT pp.*, p.english_name, p.sanskrit_name, p.category,
-               p.difficulty, p.is_bilateral
-        FROM practice_poses pp
-        JOIN poses p ON p.id = pp.pose_id
-        WHERE pp.practice_id = ?
-        ORDER BY pp.position
-    """, (practice_id,)).fetchall()
-
-    conn.close()
-    result = dict(practice)
+@router.get("")
+async def list_practices(
+    per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    name: Optional[str] = Query(None, description="Name prefix"),
+):
+    """Newest first. Summary columns are kept current by triggers on practice_poses."""
+    return json_response(await run_in_db(_list_practices, per_page, cursor, name))
+
+
+def _fetch_practice(practice_id: int) -> dict:
+    with read_connection() as conn, timed_query("get_practice"):
+        practice = conn.execute(
+            "SELECT * FROM practices WHERE id = ?", (practice_id,)
+        ).fetchone()
+        if not practice:
+            raise HTTPException(404, "Practice not found")
+
+        poses = conn.execute("""
+            SELECT pp.*, p.english_name, p.sanskrit_name, p.category,
+                   p.difficulty, p.is_bilateral
+            FROM practice_poses pp
+            JOIN poses p ON p.id = pp.pose_id
+            WHERE pp.practice_id = ?
+            ORDER BY pp.position
+        """, (practice_id,)).fetchall()
+
+    result = summary_row(practice)
     result["poses"] = [dict(p) for p in poses]
     return result
 
 
-@router.put("/{practice_id}")
-def update_practice(practice_id: int, req: PracticeUpdate):
-    conn = get_connection()
-    practice = conn.execute(
-        "SELECT * FROM practices WHERE id = ?", (practice_id,)
-    ).fetchone()
-    if not practice:
-        conn.close()
-        raise HTTPException(404, "Practice not found")
-
-    if req.name:
-        conn.execute(
-            "UPDATE practices SET name = ? WHERE id = ?",
-            (req.name, practice_id)
-        )
-
-    if req.poses is not None:
-        conn.execute("DELETE FROM practice_poses WHERE practice_id = ?", (practice_id,))
-        for p in req.poses:
+@router.get("/{practice_id}")
+async def get_practice(
+    practice_id: int,
+    expand: Optional[Literal["poses"]] = Query(None, description="'poses' embeds each pose's full detail"),
+):
+    practice = await run_in_db(_fetch_practice, practice_id)
+    if expand == "poses":
+        return json_response(embed_pose_details(practice, await get_catalog_async()))
+    return json_response(practice)
+
+
+def _update_practice(practice_id: int, req: PracticeUpdate):
+    with write_connection() as conn, timed_query("update_practice"):
+        practice = conn.execute(
+            "SELECT * FROM practices WHERE id = ?", (practice_id,)
+        ).fetchone()
+        if not practice:
+            raise HTTPException(404, "Practice not found")
+
+        if req.name:
             conn.execute(
-                "INSERT INTO practice_poses (practice_id, pose_id, position, side, hold_seconds) VALUES (?,?,?,?,?)",
-                (practice_id, p["pose_id"], p["position"],
-                 p.get("side", "both"), p.get("hold_seconds", 30))
+                "UPDATE practices SET name = ? WHERE id = ?",
+                (req.name, practice_id)
+            )
+
+        changes = None
+        if req.poses is not None:
+            stored = conn.execute(
+                "SELECT id, pose_id, position, side, hold_seconds FROM practice_poses WHERE practice_id = ?",
+                (practice_id,)
+            ).fetchall()
+            inserts, updates, deletes, changes = _diff_poses(stored, req.poses)
+            conn.executemany("DELETE FROM practice_poses WHERE id = ?", deletes)
+            _write_poses(
+                conn,
+                "UPDATE practice_poses SET position = ?, pose_id = ?, side = ?, hold_seconds = ? WHERE id = ?",
+                updates
             )
+            _write_poses(conn, INSERT_POSE_SQL, (_pose_row(practice_id, p) for p in inserts))
+    return changes
+
+
+@router.put("/{practice_id}")
+async def update_practice(practice_id: int, req: PracticeUpdate):
+    changes = await run_in_db(_update_practice, practice_id, req)
+    return {"message": "Practice updated", "changes": changes}
 
-    conn.commit()
-    conn.close()
-    return {"message": "Practice updated"}
+
+def _delete_practice(practice_id: int):
+    with write_connection() as conn, timed_query("delete_practice"):
+        practice = conn.execute(
+            "SELECT * FROM practices WHERE id = ?", (practice_id,)
+        ).fetchone()
+        if not practice:
+            raise HTTPException(404, "Practice not found")
+
+        conn.execute("DELETE FROM practice_poses WHERE practice_id = ?", (practice_id,))
+        conn.execute("DELETE FROM practices WHERE id = ?", (practice_id,))
 
 
 @router.delete("/{practice_id}")
-def delete_practice(practice_id: int):
-    conn = get_connection()
-    practice = conn.execute(
-        "SELECT * FROM practices WHERE id = ?", (practice_id,)
-    ).fetchone()
-    if not practice:
-        conn.close()
-        raise HTTPException(404, "Practice not found")
-
-    conn.execute("DELETE FROM practice_poses WHERE practice_id = ?", (practice_id,))
-    conn.execute("DELETE FROM practices WHERE id = ?", (practice_id,))
-    conn.commit()
-    conn.close()
+async def delete_practice(practice_id: int):
+    await run_in_db(_delete_practice, practice_id)
     return {"message": "Practice deleted"}
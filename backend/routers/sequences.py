@@ -2,14 +2,23 @@
 routers/sequences.py — Generate & manage yoga sequences.
 Intelligent sequence builder with warmup → peak → cooldown structure.
 """
-from fastapi import APIRouter, Query, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import List, Literal, NamedTuple, Optional
+import hashlib
 import random
 import json
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
-from database import get_connection
+from database import read_connection, write_connection, run_in_db, summary_row
+from catalog import embed_pose_details, get_catalog, get_catalog_async
+from transitions import transition_graph, order_for_flow
+from http_cache import catalog_response
+from metrics import timed_query
+from fast_json import json_response
+from pagination import like_prefix, newest_first
+from routers.library import item_text
 
 router = APIRouter(prefix="/api/sequences", tags=["sequences"])
 
@@ -119,146 +128,304 @@ STYLE_TEMPLATES = {
 }
 
 
-def _fetch_poses_by_criteria(conn, tags, categories, max_diff, exclude_ids, limit):
-    """Fetch poses matching tags OR categories, respecting difficulty ceiling."""
-    tag_placeholders = ",".join("?" for _ in tags)
-    cat_placeholders = ",".join("?" for _ in categories)
-    excl_placeholders = ",".join("?" for _ in exclude_ids) if exclude_ids else "0"
-
-    sql = f"""
-        SELECT DISTINCT p.id, p.english_name, p.sanskrit_name, p.category,
-               p.difficulty, p.is_bilateral, p.default_hold_seconds
-        FROM poses p
-        LEFT JOIN pose_tags pt ON pt.pose_id = p.id
-        WHERE p.difficulty <= ?
-          AND p.parent_pose_id IS NULL
-          AND p.id NOT IN ({excl_placeholders})
-          AND (pt.tag IN ({tag_placeholders}) OR p.category IN ({cat_placeholders}))
-        GROUP BY p.id
-        ORDER BY RANDOM()
-        LIMIT ?
-    """
-    params = [max_diff] + list(exclude_ids) + list(tags) + list(categories) + [limit]
-    return conn.execute(sql, params).fetchall()
+PHASES = ("warmup", "peak", "cooldown")
+
+
+class CandidatePool(NamedTuple):
+    """Top-level poses eligible for one style phase, sorted by difficulty.
+    cutoffs[d] is how many of them have difficulty <= d, so the candidates
+    for any difficulty ceiling are a prefix of `poses`."""
+    poses: tuple
+    cutoffs: tuple
+
+
+def _build_pools(catalog) -> dict:
+    """Precompute a CandidatePool per (style, phase) from the catalog indexes."""
+    pools = {}
+    for style, template in STYLE_TEMPLATES.items():
+        for phase in PHASES:
+            bits = 0
+            for tag in template[f"{phase}_tags"]:
+                bits |= catalog.tag_bits.get(tag, 0)
+            for category in template[f"{phase}_categories"]:
+                bits |= catalog.category_bits.get(category, 0)
+            poses = sorted(
+                catalog.select(bits & catalog.top_level_bits),
+                key=lambda p: (p.difficulty, p.ordinal),
+            )
+            cutoffs = tuple(sum(1 for p in poses if p.difficulty <= d) for d in range(6))
+            pools[style, phase] = CandidatePool(tuple(poses), cutoffs)
+    return pools
 
 
-def generate_sequence_logic(style: str, duration_minutes: int, difficulty: int):
-    """Build an intelligent sequence: warmup → peak → cooldown."""
-    template = STYLE_TEMPLATES.get(style, STYLE_TEMPLATES["full_body"])
+_pools_snapshot = (None, None)
+
+
+def _candidate_pools(catalog) -> dict:
+    """Pools for the current catalog snapshot, rebuilt when the catalog changes."""
+    global _pools_snapshot
+    built_for, pools = _pools_snapshot
+    if built_for is not catalog:
+        pools = _build_pools(catalog)
+        _pools_snapshot = (catalog, pools)
+    return pools
+
+
+def _sample_poses(pool: CandidatePool, max_diff, exclude_ids, limit, rng):
+    """
+    Draw up to `limit` distinct poses at or under `max_diff`, skipping
+    exclude_ids — a partial Fisher–Yates shuffle that only records the
+    swapped slots, so it costs O(limit + skips) rather than O(pool).
+    """
+    n = pool.cutoffs[max(0, min(max_diff, 5))]
+    swaps = {}
+    picked = []
+    for i in range(n):
+        if len(picked) >= limit:
+            break
+        j = rng.randrange(i, n)
+        chosen = swaps.get(j, j)
+        swaps[j] = swaps.get(i, i)
+        pose = pool.poses[chosen]
+        if pose.id not in exclude_ids:
+            picked.append(pose)
+    return picked
+
+
+def _preferred_hold(pose, phase: str) -> int:
+    """Warmups stay short, cooldowns linger, peaks use the pose default."""
+    if phase == "warmup":
+        return min(pose.default_hold_seconds, 30)
+    if phase == "cooldown":
+        return max(pose.default_hold_seconds, 45)
+    return pose.default_hold_seconds
+
+
+# ─── Duration-exact planner ────────────────────────────────────────────
+PHASE_SHARES = {"warmup": 0.25, "peak": 0.5, "cooldown": 0.25}
+HOLD_RANGE = (0.5, 2.0)      # hold bounds, relative to a pose's preferred hold
+MIN_HOLD_SECONDS = 10
+HOLD_STEP = 5                # holds are planned in 5-second steps
+SAVASANA_SHARE = 0.1
+SAVASANA_BOUNDS = (60, 600)
+MAX_PLAN_CANDIDATES = 48
+
+# 2-opt moves flow=optimized may try across all phases (~5 ms); a fixed
+# count rather than a deadline, so a seed still pins the output
+FLOW_BUDGET_CHECKS = 3000
+# Planning cost grows with the target duration, so bound what clients can ask for
+MAX_DURATION_MINUTES = 180
+
+
+def _round_hold(seconds) -> int:
+    return max(HOLD_STEP, HOLD_STEP * round(seconds / HOLD_STEP))
+
+
+def _hold_bounds(hold: int):
+    return (max(MIN_HOLD_SECONDS, _round_hold(hold * HOLD_RANGE[0])),
+            max(hold, _round_hold(hold * HOLD_RANGE[1])))
+
+
+def _closest_subset(weights, target):
+    """
+    Indices of a subset of `weights` whose sum is as close as possible to
+    `target` — a 0/1 knapsack solved as a bitset subset-sum, where bit s
+    of a Python int marks sum s as reachable.
+    """
+    limit = (1 << (2 * target + 1)) - 1  # sums past 2x target can't be closest
+    reachable = 1
+    history = []
+    for w in weights:
+        history.append(reachable)
+        reachable = (reachable | (reachable << w)) & limit
+
+    best = 0
+    for d in range(target + 1):
+        if reachable >> (target - d) & 1:
+            best = target - d
+            break
+        if reachable >> (target + d) & 1:
+            best = target + d
+            break
+
+    chosen = []
+    for i in range(len(weights) - 1, -1, -1):
+        if not history[i] >> best & 1:
+            chosen.append(i)
+            best -= weights[i]
+    return chosen[::-1]
+
+
+def _fit_holds(picks, budget: int):
+    """
+    Stretch or shrink per-side holds, each within its bounds, so that the
+    phase totals `budget` seconds. `picks` is a list of [pose, hold, lo, hi].
+    """
+    def residual():
+        return budget - sum(h * (2 if p.is_bilateral else 1) for p, h, _, _ in picks)
+
+    # Proportional passes, then single steps to mop up rounding
+    for _ in range(4):
+        r = residual()
+        flexible = [pk for pk in picks if (pk[1] < pk[3] if r > 0 else pk[1] > pk[2])]
+        if abs(r) < HOLD_STEP or not flexible:
+            break
+        per_side = r / sum(2 if p.is_bilateral else 1 for p, _, _, _ in flexible)
+        for pk in flexible:
+            pk[1] = min(pk[3], max(pk[2], _round_hold(pk[1] + per_side)))
+
+    for pk in sorted(picks, key=lambda pk: pk[0].is_bilateral):
+        r = residual()
+        step = HOLD_STEP if r > 0 else -HOLD_STEP
+        sides = 2 if pk[0].is_bilateral else 1
+        while abs(r - step * sides) < abs(r) and pk[2] <= pk[1] + step <= pk[3]:
+            pk[1] += step
+            r -= step * sides
+    return [(p, h) for p, h, _, _ in picks]
+
+
+def _plan_exact(pools, template_id, ceilings, target_seconds, used_ids, rng):
+    """
+    Choose poses and holds per phase so the sequence lands on target_seconds.
+    Each phase gets its share of the time; a subset-sum picks poses whose
+    preferred holds come closest, then holds are tuned within bounds. Any
+    shortfall carries into the next phase.
+    """
+    plan = []
+    carry = 0
+    for phase in PHASES:
+        budget = int(target_seconds * PHASE_SHARES[phase]) + carry
+        candidates = _sample_poses(
+            pools[template_id, phase], ceilings[phase], used_ids, MAX_PLAN_CANDIDATES, rng
+        )
+        holds = [_preferred_hold(p, phase) for p in candidates]
+        weights = [
+            max(1, round(h * (2 if p.is_bilateral else 1) / HOLD_STEP))
+            for p, h in zip(candidates, holds)
+        ]
+        chosen = _closest_subset(weights, max(0, budget) // HOLD_STEP)
+        picks = [[candidates[i], holds[i], *_hold_bounds(holds[i])] for i in chosen]
+        picks = _fit_holds(picks, budget)
+
+        used_ids.update(p.id for p, _ in picks)
+        carry = budget - sum(h * (2 if p.is_bilateral else 1) for p, h in picks)
+        plan.append((phase, picks))
+    return plan
+
+
+def _order_plan(catalog, plan):
+    """Reorder poses within each phase to minimise transition cost,
+    chaining each phase from where the previous one ended."""
+    graph = transition_graph(catalog)
+    total = sum(len(picks) for _, picks in plan) or 1
+    ordered = []
+    last_id = None
+    for phase, picks in plan:
+        holds = {pose.id: (pose, hold) for pose, hold in picks}
+        # Each phase gets its share of the budget
+        ids = order_for_flow(graph, list(holds), start_id=last_id,
+                             max_checks=FLOW_BUDGET_CHECKS * len(picks) // total)
+        ordered.append((phase, [holds[i] for i in ids]))
+        if ids:
+            last_id = ids[-1]
+    return ordered
+
+
+def generate_sequence_logic(style: str, duration_minutes: int, difficulty: int,
+                            rng=random, catalog=None, planner: str = "classic",
+                            flow: str = "random"):
+    """
+    Build an intelligent sequence: warmup → peak → cooldown.
+    Pass a seeded random.Random as `rng` for reproducible output, and a
+    fixed `catalog` snapshot to keep a batch consistent. planner="exact"
+    plans poses and holds to hit duration_minutes instead of estimating
+    a pose count; flow="optimized" orders each phase for smooth transitions.
+    When the style's poses can't fill the target even at their longest
+    holds, shortfall_minutes says by how much.
+    """
+    template_id = style if style in STYLE_TEMPLATES else "full_body"
+    template = STYLE_TEMPLATES[template_id]
     max_diff = min(difficulty, template["max_difficulty"])
+    ceilings = {"warmup": max(1, max_diff - 1), "peak": max_diff, "cooldown": 2}
 
-    conn = get_connection()
+    catalog = catalog or get_catalog()
+    pools = _candidate_pools(catalog)
+    savasana = catalog.by_slug.get("corpse-pose")
     used_ids = set()
     sequence_poses = []
     position = 0
 
-    # Calculate phase sizes based on duration
-    # A pose averages ~30s, so duration_min * 60 / 30 ≈ total poses
-    total_poses = max(6, duration_minutes * 2)
-    warmup_count = max(2, total_poses // 4)
-    cooldown_count = max(2, total_poses // 4)
-    peak_count = total_poses - warmup_count - cooldown_count
-
-    # ─── Warmup ─────────────────────────────
-    warmup = _fetch_poses_by_criteria(
-        conn, template["warmup_tags"], template["warmup_categories"],
-        max(1, max_diff - 1), used_ids, warmup_count
-    )
-    for pose in warmup:
+    def add_pose(pose, hold_seconds, phase):
+        nonlocal position
         position += 1
-        pose_dict = dict(pose)
-        used_ids.add(pose_dict["id"])
+        used_ids.add(pose.id)
         entry = {
             "position": position,
-            "pose_id": pose_dict["id"],
-            "english_name": pose_dict["english_name"],
-            "sanskrit_name": pose_dict["sanskrit_name"],
+            "pose_id": pose.id,
+            "english_name": pose.english_name,
+            "sanskrit_name": pose.sanskrit_name,
             "side": "both",
-            "hold_seconds": min(pose_dict["default_hold_seconds"], 30),
-            "phase": "warmup",
+            "hold_seconds": hold_seconds,
+            "phase": phase,
         }
         sequence_poses.append(entry)
         # Add other side if bilateral
-        if pose_dict["is_bilateral"]:
+        if pose.is_bilateral:
             position += 1
             entry_r = {**entry, "position": position, "side": "right"}
             entry["side"] = "left"
             sequence_poses.append(entry_r)
 
-    # ─── Peak ───────────────────────────────
-    peak = _fetch_poses_by_criteria(
-        conn, template["peak_tags"], template["peak_categories"],
-        max_diff, used_ids, peak_count
-    )
-    for pose in peak:
-        position += 1
-        pose_dict = dict(pose)
-        used_ids.add(pose_dict["id"])
-        entry = {
-            "position": position,
-            "pose_id": pose_dict["id"],
-            "english_name": pose_dict["english_name"],
-            "sanskrit_name": pose_dict["sanskrit_name"],
-            "side": "both",
-            "hold_seconds": pose_dict["default_hold_seconds"],
-            "phase": "peak",
-        }
-        sequence_poses.append(entry)
-        if pose_dict["is_bilateral"]:
-            position += 1
-            entry_r = {**entry, "position": position, "side": "right"}
-            entry["side"] = "left"
-            sequence_poses.append(entry_r)
-
-    # ─── Cooldown ───────────────────────────
-    cooldown = _fetch_poses_by_criteria(
-        conn, template["cooldown_tags"], template["cooldown_categories"],
-        2, used_ids, cooldown_count
-    )
-    for pose in cooldown:
-        position += 1
-        pose_dict = dict(pose)
-        used_ids.add(pose_dict["id"])
-        entry = {
-            "position": position,
-            "pose_id": pose_dict["id"],
-            "english_name": pose_dict["english_name"],
-            "sanskrit_name": pose_dict["sanskrit_name"],
-            "side": "both",
-            "hold_seconds": max(pose_dict["default_hold_seconds"], 45),
-            "phase": "cooldown",
+    if planner == "exact":
+        target_seconds = duration_minutes * 60
+        savasana_hold = _round_hold(
+            min(SAVASANA_BOUNDS[1], max(SAVASANA_BOUNDS[0], target_seconds * SAVASANA_SHARE))
+        )
+        if savasana:
+            used_ids.add(savasana.id)
+            target_seconds -= savasana_hold
+        plan = _plan_exact(pools, template_id, ceilings, target_seconds, used_ids, rng)
+    else:
+        # Calculate phase sizes based on duration
+        # A pose averages ~30s, so duration_min * 60 / 30 ≈ total poses
+        total_poses = max(6, duration_minutes * 2)
+        warmup_count = max(2, total_poses // 4)
+        cooldown_count = max(2, total_poses // 4)
+        counts = {
+            "warmup": warmup_count,
+            "peak": total_poses - warmup_count - cooldown_count,
+            "cooldown": cooldown_count,
         }
-        sequence_poses.append(entry)
-        if pose_dict["is_bilateral"]:
-            position += 1
-            entry_r = {**entry, "position": position, "side": "right"}
-            entry["side"] = "left"
-            sequence_poses.append(entry_r)
+        savasana_hold = max(120, duration_minutes * 10)
+        plan = []
+        for phase in PHASES:
+            picked = _sample_poses(
+                pools[template_id, phase], ceilings[phase], used_ids, counts[phase], rng
+            )
+            used_ids.update(p.id for p in picked)
+            plan.append((phase, [(p, _preferred_hold(p, phase)) for p in picked]))
+
+    if flow == "optimized":
+        plan = _order_plan(catalog, plan)
+
+    for phase, picks in plan:
+        for pose, hold in picks:
+            add_pose(pose, hold, phase)
 
     # Always end with Savasana
-    savasana = conn.execute(
-        "SELECT id, english_name, sanskrit_name, default_hold_seconds FROM poses WHERE slug='corpse-pose'"
-    ).fetchone()
-    if savasana and savasana["id"] not in used_ids:
-        position += 1
-        sequence_poses.append({
-            "position": position,
-            "pose_id": savasana["id"],
-            "english_name": savasana["english_name"],
-            "sanskrit_name": savasana["sanskrit_name"],
-            "side": "both",
-            "hold_seconds": max(120, duration_minutes * 10),
-            "phase": "cooldown",
-        })
-
-    conn.close()
+    if savasana and not any(p["pose_id"] == savasana.id for p in sequence_poses):
+        add_pose(savasana, savasana_hold, "cooldown")
 
     total_seconds = sum(p["hold_seconds"] for p in sequence_poses)
     return {
         "style": style,
         "style_name": template["name"],
         "difficulty": max_diff,
+        "planner": planner,
+        "flow": flow,
+        "target_minutes": duration_minutes,
         "duration_minutes": round(total_seconds / 60, 1),
+        "shortfall_minutes": round(max(0, duration_minutes * 60 - total_seconds) / 60, 1),
         "total_poses": len(sequence_poses),
         "poses": sequence_poses,
     }
@@ -268,20 +435,90 @@ def generate_sequence_logic(style: str, duration_minutes: int, difficulty: int):
 
 class GenerateRequest(BaseModel):
     style: str = "full_body"
-    duration_minutes: int = 20
+    duration_minutes: int = Field(20, ge=1, le=MAX_DURATION_MINUTES)
     difficulty: int = 3
+    planner: Literal["classic", "exact"] = "classic"
+    flow: Literal["random", "optimized"] = "random"
 
 
 @router.post("/generate")
-def generate_sequence(req: GenerateRequest):
+async def generate_sequence(req: GenerateRequest):
     if req.style not in STYLE_TEMPLATES:
         raise HTTPException(400, f"Unknown style. Available: {list(STYLE_TEMPLATES.keys())}")
-    return generate_sequence_logic(req.style, req.duration_minutes, req.difficulty)
+    catalog = await get_catalog_async()
+    args = (req.style, req.duration_minutes, req.difficulty)
+    kwargs = {"catalog": catalog, "planner": req.planner, "flow": req.flow}
+    if req.flow == "optimized":
+        # Ordering may take a few ms of CPU; don't hold the event loop for it
+        return await run_in_threadpool(generate_sequence_logic, *args, **kwargs)
+    return generate_sequence_logic(*args, **kwargs)
+
+
+MAX_BATCH_SEQUENCES = 1000
+
+
+class BatchGenerateSpec(BaseModel):
+    style: str = "full_body"
+    duration_minutes: int = Field(20, ge=1, le=MAX_DURATION_MINUTES)
+    difficulty: int = 3
+    seed: Optional[int] = None
+    count: int = Field(1, ge=1, le=MAX_BATCH_SEQUENCES)
+    planner: Literal["classic", "exact"] = "classic"
+    flow: Literal["random", "optimized"] = "random"
+
+
+@router.post("/generate/batch")
+async def generate_sequence_batch(specs: List[BatchGenerateSpec]):
+    """
+    Generate many sequences in one call from a single catalog snapshot.
+    Each spec's sequences come from random.Random(seed), so the same spec
+    and seed always give the same result; specs without a seed get one
+    assigned and echoed back.
+    """
+    for i, spec in enumerate(specs):
+        if spec.style not in STYLE_TEMPLATES:
+            raise HTTPException(400, f"Spec {i}: unknown style. Available: {list(STYLE_TEMPLATES.keys())}")
+    if sum(spec.count for spec in specs) > MAX_BATCH_SEQUENCES:
+        raise HTTPException(400, f"A batch can generate at most {MAX_BATCH_SEQUENCES} sequences")
+
+    catalog = await get_catalog_async()
+    return await run_in_threadpool(_generate_batch, specs, catalog)
+
+
+def _generate_batch(specs, catalog) -> dict:
+    results = []
+    for spec in specs:
+        seed = spec.seed if spec.seed is not None else random.randrange(2**32)
+        rng = random.Random(seed)
+        results.append({
+            "style": spec.style,
+            "duration_minutes": spec.duration_minutes,
+            "difficulty": spec.difficulty,
+            "seed": seed,
+            "sequences": [
+                generate_sequence_logic(spec.style, spec.duration_minutes, spec.difficulty,
+                                        rng=rng, catalog=catalog,
+                                        planner=spec.planner, flow=spec.flow)
+                for _ in range(spec.count)
+            ],
+        })
+    return {"catalog_version": catalog.version, "results": results}
+
+
+# Styles live in code, so their ETag also changes when the templates do
+STYLES_DIGEST = hashlib.sha1(json.dumps(STYLE_TEMPLATES, sort_keys=True).encode()).hexdigest()[:8]
 
 
 @router.get("/styles")
-def list_styles():
-    return [{"id": k, "name": v["name"]} for k, v in STYLE_TEMPLATES.items()]
+async def list_styles(request: Request):
+    catalog = await get_catalog_async()
+    return await catalog_response(
+        request, catalog,
+        lambda: catalog.encoded("styles", lambda: [
+            {"id": k, "name": v["name"]} for k, v in STYLE_TEMPLATES.items()
+        ]),
+        salt=STYLES_DIGEST,
+    )
 
 
 class SaveSequenceRequest(BaseModel):
@@ -292,64 +529,97 @@ class SaveSequenceRequest(BaseModel):
     poses: list  # [{pose_id, position, side, hold_seconds}]
 
 
-@router.post("")
-def save_sequence(req: SaveSequenceRequest):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO sequences (name, description, style, difficulty) VALUES (?,?,?,?)",
-        (req.name, req.description, req.style, req.difficulty)
-    )
-    seq_id = cursor.lastrowid
-    for p in req.poses:
+LIST_COLUMNS = ("id, name, description, style, difficulty, created_at, "
+                "pose_count, total_seconds, max_difficulty, category_mix")
+
+
+def _insert_sequence(req: SaveSequenceRequest) -> int:
+    with write_connection() as conn, timed_query("save_sequence"):
+        cursor = conn.cursor()
         cursor.execute(
+            "INSERT INTO sequences (name, description, style, difficulty) VALUES (?,?,?,?)",
+            (req.name, req.description, req.style, req.difficulty)
+        )
+        seq_id = cursor.lastrowid
+        cursor.executemany(
             "INSERT INTO sequence_poses (sequence_id, pose_id, position, side, hold_seconds) VALUES (?,?,?,?,?)",
-            (seq_id, p["pose_id"], p["position"], p.get("side", "both"), p.get("hold_seconds", 30))
+            ((seq_id, p["pose_id"], p["position"], p.get("side", "both"), p.get("hold_seconds", 30))
+             for p in req.poses)
         )
-    conn.commit()
-    conn.close()
+    return seq_id
+
+
+@router.post("")
+async def save_sequence(req: SaveSequenceRequest):
+    seq_id = await run_in_db(_insert_sequence, req)
     return {"id": seq_id, "message": "Sequence saved"}
 
 
-@router.get("")
-def list_sequences():
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT s.*, COUNT(sp.id) as pose_count FROM sequences s LEFT JOIN sequence_poses sp ON sp.sequence_id = s.id GROUP BY s.id ORDER BY s.created_at DESC"
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+def _list_sequences(per_page: int, cursor: Optional[str], style: Optional[str],
+                    difficulty: Optional[int], name: Optional[str]) -> dict:
+    where, params = [], []
+    if style:
+        where.append("style = ?")
+        params.append(style)
+    if difficulty is not None:
+        where.append("difficulty = ?")
+        params.append(difficulty)
+    if name:
+        where.append("name LIKE ? ESCAPE '\\'")
+        params.append(like_prefix(name))
+    with read_connection() as conn, timed_query("list_sequences"):
+        rows, next_cursor = newest_first(
+            conn, "sequences", LIST_COLUMNS,
+            where, params, per_page, cursor,
+        )
+    return {"sequences": [summary_row(r) for r in rows], "next_cursor": next_cursor}
 
 
-@router.get("/{seq_id}")
-def get_sequence(seq_id: int):
-    conn = get_connection()
-    seq = conn.execute("SELECT * FROM sequences WHERE id = ?", (seq_id,)).fetchone()
-    if not seq:
-        conn.close()
-        raise HTTPException(404, "Sequence not found")
-
-    poses = conn.execute("""
-        SELECT sp.*, p.english_name, p.sanskrit_name, p.category, p.difficulty
-        FROM sequence_poses sp
-        JOIN poses p ON p.id = sp.pose_id
-        WHERE sp.sequence_id = ?
-        ORDER BY sp.position
-    """, (seq_id,)).fetchall()
-
-    conn.close()
-    result = dict(seq)
+@router.get("")
+async def list_sequences(
+    per_page: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    style: Optional[str] = None,
+    difficulty: Optional[int] = Query(None, ge=1, le=5),
+    name: Optional[str] = Query(None, description="Name prefix"),
+):
+    """Newest first. Summary columns are kept current by triggers on sequence_poses."""
+    return json_response(await run_in_db(_list_sequences, per_page, cursor, style, difficulty, name))
+
+
+def _fetch_sequence(seq_id: int) -> dict:
+    with read_connection() as conn, timed_query("get_sequence"):
+        seq = conn.execute("SELECT * FROM sequences WHERE id = ?", (seq_id,)).fetchone()
+        if not seq:
+            raise HTTPException(404, "Sequence not found")
+
+        poses = conn.execute("""
+            SELECT sp.*, p.english_name, p.sanskrit_name, p.category, p.difficulty
+            FROM sequence_poses sp
+            JOIN poses p ON p.id = sp.pose_id
+            WHERE sp.sequence_id = ?
+            ORDER BY sp.position
+        """, (seq_id,)).fetchall()
+
+    result = summary_row(seq)
     result["poses"] = [dict(p) for p in poses]
     return result
 
 
+@router.get("/{seq_id}")
+async def get_sequence(
+    seq_id: int,
+    expand: Optional[Literal["poses"]] = Query(None, description="'poses' embeds each pose's full detail"),
+):
+    sequence = await run_in_db(_fetch_sequence, seq_id)
+    if expand == "poses":
+        return json_response(embed_pose_details(sequence, await get_catalog_async()))
+    return json_response(sequence)
+
+
 @router.get("/{seq_id}/export")
-def export_sequence(seq_id: int, format: str = Query("json", pattern="^(json|text)$")):
-    data = get_sequence(seq_id)
+async def export_sequence(seq_id: int, format: str = Query("json", pattern="^(json|text)$")):
+    data = await run_in_db(_fetch_sequence, seq_id)
     if format == "text":
-        lines = [f"# {data['name']}", f"Style: {data['style']}", f"Difficulty: {data['difficulty']}", ""]
-        for p in data["poses"]:
-            side_str = f" ({p['side']})" if p["side"] != "both" else ""
-            lines.append(f"{p['position']}. {p['english_name']}{side_str} — {p['hold_seconds']}s")
-        return {"text": "\n".join(lines)}
-    return data
+        return {"text": item_text(data)}
+    return json_response(data)
@@ -3,8 +3,12 @@ seed_poses.py — Comprehensive yoga pose database.
 300+ poses with Sanskrit names, categories, difficulty, and tags.
 Sources: Yoga Journal A-Z, expanded with variations, sides, and advanced asanas.
 """
+import hashlib
+import os
+import shutil
 import sqlite3
-from database import get_connection
+
+SEED_ARTIFACT_PATH = os.path.join(os.path.dirname(__file__), "asana_studio.seed.db")
 
 # ─── Category constants ────────────────────────────────────────────────
 CAT_STANDING   = "Standing"
@@ -862,71 +866,129 @@ def _slugify(name: str) -> str:
     return slug.strip("-")
 
 
-def seed_database():
-    """Insert all poses into the database."""
-    from database import init_db, db_is_seeded, get_connection
-
-    init_db()
-    if db_is_seeded():
-        print("Database already seeded.")
-        return
+def seed_hash() -> str:
+    """Content hash of POSES; stored in catalog_meta by every seed."""
+    return hashlib.sha256(repr(POSES).encode()).hexdigest()[:16]
 
-    conn = get_connection()
-    cursor = conn.cursor()
-    pose_count = 0
 
-    for english, sanskrit, category, diff, hold, bilateral, tags, desc in POSES:
+def _expand_poses(poses=None):
+    """
+    Expand POSES (or any list in the same format) into insert-ready rows,
+    each bilateral pose followed by its left/right variants: (slug,
+    parent_slug, english, sanskrit, description, category, difficulty,
+    bilateral, hold, tags).
+    """
+    slugs = set()
+    for english, sanskrit, category, diff, hold, bilateral, tags, desc in (POSES if poses is None else poses):
         slug = _slugify(english)
 
         # Avoid duplicate slugs
-        existing = cursor.execute("SELECT id FROM poses WHERE slug=?", (slug,)).fetchone()
-        if existing:
+        if slug in slugs:
             slug = slug + "-v"
-
-        cursor.execute("""
-            INSERT INTO poses (english_name, sanskrit_name, slug, description,
-                               category, difficulty, is_bilateral, default_hold_seconds)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (english, sanskrit, slug, desc, category, diff, int(bilateral), hold))
-
-        pose_id = cursor.lastrowid
-        pose_count += 1
-
-        # Insert tags
-        for tag in tags:
-            cursor.execute(
-                "INSERT OR IGNORE INTO pose_tags (pose_id, tag) VALUES (?, ?)",
-                (pose_id, tag)
-            )
+        slugs.add(slug)
+        yield (slug, None, english, sanskrit, desc, category, diff, int(bilateral), hold, tags)
 
         # If bilateral, create left/right variants
         if bilateral:
             for side in ["Left", "Right"]:
-                side_name = f"{english} ({side})"
                 side_slug = f"{_slugify(english)}-{side.lower()}"
-                side_sanskrit = f"{sanskrit} ({side})" if sanskrit else None
-
-                cursor.execute("""
-                    INSERT INTO poses (english_name, sanskrit_name, slug, description,
-                                       category, difficulty, is_bilateral, default_hold_seconds,
-                                       parent_pose_id)
-                    VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)
-                """, (side_name, side_sanskrit, side_slug,
-                      f"{desc} — {side.lower()} side.",
-                      category, diff, hold, pose_id))
-
-                child_id = cursor.lastrowid
-                pose_count += 1
-
-                for tag in tags:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO pose_tags (pose_id, tag) VALUES (?, ?)",
-                        (child_id, tag)
-                    )
-
-    conn.commit()
+                slugs.add(side_slug)
+                yield (side_slug, slug, f"{english} ({side})",
+                       f"{sanskrit} ({side})" if sanskrit else None,
+                       f"{desc} — {side.lower()} side.",
+                       category, diff, 0, hold, tags)
+
+
+def seed_database(db_path: str = None):
+    """
+    Insert or refresh all poses in one transaction.
+    Rows are matched on slug, so re-seeding after POSES changes keeps
+    existing pose ids — and the practices that reference them — intact.
+    Does nothing when the stored seed hash is already current.
+    """
+    from database import init_db, get_connection, get_meta, set_meta
+
+    init_db(db_path)
+    conn = get_connection(db_path)
+    current_hash = seed_hash()
+    if get_meta(conn, "seed_hash") == current_hash:
+        conn.close()
+        print("Database already seeded.")
+        return
+
+    ids = dict(conn.execute("SELECT slug, id FROM poses").fetchall())
+    existing = set(ids.values())
+    next_id = max(existing, default=0) + 1
+    pose_rows, tag_rows = [], []
+    for slug, parent_slug, english, sanskrit, desc, category, diff, bilateral, hold, tags in _expand_poses():
+        if slug not in ids:
+            ids[slug] = next_id
+            next_id += 1
+        pose_id = ids[slug]
+        pose_rows.append((pose_id, english, sanskrit, slug, desc, category, diff,
+                          bilateral, hold, ids[parent_slug] if parent_slug else None))
+        tag_rows.extend((pose_id, tag) for tag in tags)
+
+    with conn:
+        conn.executemany("""
+            INSERT INTO poses (id, english_name, sanskrit_name, slug, description,
+                               category, difficulty, is_bilateral, default_hold_seconds,
+                               parent_pose_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                english_name = excluded.english_name, sanskrit_name = excluded.sanskrit_name,
+                description = excluded.description, category = excluded.category,
+                difficulty = excluded.difficulty, is_bilateral = excluded.is_bilateral,
+                default_hold_seconds = excluded.default_hold_seconds,
+                parent_pose_id = excluded.parent_pose_id
+        """, pose_rows)
+        conn.executemany(
+            "DELETE FROM pose_tags WHERE pose_id = ?",
+            ((row[0],) for row in pose_rows if row[0] in existing)
+        )
+        conn.executemany("INSERT OR IGNORE INTO pose_tags (pose_id, tag) VALUES (?, ?)", tag_rows)
+        set_meta(conn, "seed_hash", current_hash)
     conn.close()
-    print(f"✅ Seeded {pose_count} poses (including bilateral L/R variants).")
+
+    if db_path is None:
+        from catalog import invalidate_catalog
+        invalidate_catalog()
+    print(f"✅ Seeded {len(pose_rows)} poses (including bilateral L/R variants).")
+
+
+def _artifact_hash(path: str):
+    """Seed hash recorded in a prebuilt database, or None if unusable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = 'seed_hash'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def ensure_seeded(db_path: str = None, artifact_path: str = SEED_ARTIFACT_PATH):
+    """
+    Startup hook. A fresh install starts from the prebuilt artifact (see
+    build_seed_db.py) when its hash matches POSES; otherwise, and for
+    existing databases, seed_database() re-seeds only if the hash changed.
+    """
+    import database
+
+    path = db_path or database.DB_PATH
+    if not os.path.exists(path) and _artifact_hash(artifact_path) == seed_hash():
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        shutil.copyfile(artifact_path, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        print("✅ Database restored from prebuilt seed artifact.")
+
+    seed_database(db_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+"""
+static_assets.py — Fingerprinted, precompressed frontend assets.
+At startup every file under css/, js/ and assets/ is hashed into an
+immutable URL (style.css → style.3f2a9c1d7e.css), compressed once with
+gzip (and brotli, if installed), and index.html is rewritten to point at
+the fingerprinted names. Requests pick the best stored encoding.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+ASSET_DIRS = ("css", "js", "assets")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+MIN_COMPRESS_BYTES = 256
+_REFERENCE = re.compile(r'(src|href)="(/(?:%s)/[^"?#]+)"' % "|".join(ASSET_DIRS))
+
+
+class Asset(NamedTuple):
+    body: bytes
+    content_type: str
+    etag: str
+    encoded: dict          # {"br": bytes, "gzip": bytes}, only when smaller
+    immutable: bool
+
+
+def _asset(body: bytes, path: str, digest: str, immutable: bool) -> Asset:
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+    encoded = {}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        candidates = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            candidates["br"] = brotli.compress(body, quality=11)
+        encoded = {k: v for k, v in candidates.items() if len(v) < len(body)}
+    return Asset(body, content_type, f'"{digest}"', encoded, immutable)
+
+
+def _fingerprinted(url: str, digest: str) -> str:
+    stem, ext = os.path.splitext(url)
+    return f"{stem}.{digest}{ext}"
+
+
+class AssetBundle:
+    """All frontend assets in memory, keyed by URL path."""
+
+    def __init__(self, frontend_dir: str):
+        self.assets = {}
+        self.urls = {}   # logical URL → fingerprinted URL
+        for directory in ASSET_DIRS:
+            root = os.path.join(frontend_dir, directory)
+            for dirpath, _, filenames in os.walk(root):
+                for filename in sorted(filenames):
+                    if filename.startswith("."):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    with open(path, "rb") as f:
+                        body = f.read()
+                    digest = hashlib.sha256(body).hexdigest()[:10]
+                    url = "/" + os.path.relpath(path, frontend_dir).replace(os.sep, "/")
+                    fingerprinted = _fingerprinted(url, digest)
+                    self.urls[url] = fingerprinted
+                    self.assets[fingerprinted] = asset = _asset(body, path, digest, immutable=True)
+                    # Old, unversioned URLs keep working but must revalidate
+                    self.assets[url] = asset._replace(immutable=False)
+
+        index_path = os.path.join(frontend_dir, "index.html")
+        self.index = None
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                html = _REFERENCE.sub(
+                    lambda m: f'{m.group(1)}="{self.urls.get(m.group(2), m.group(2))}"', f.read()
+                )
+            body = html.encode()
+            self.index = _asset(body, index_path, hashlib.sha256(body).hexdigest()[:10], immutable=False)
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Accept-Encoding as {coding: q}."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _choose_encoding(asset: Asset, header: Optional[str]) -> Optional[str]:
+    if not header or not asset.encoded:
+        return None
+    accepted = _accepted_encodings(header)
+    for coding in ("br", "gzip"):
+        if coding in asset.encoded and accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def asset_response(request: Request, asset: Asset) -> Response:
+    coding = _choose_encoding(asset, request.headers.get("accept-encoding"))
+    etag = asset.etag if coding is None else f'{asset.etag[:-1]}-{coding}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if asset.immutable else REVALIDATE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+        return Response(asset.encoded[coding], media_type=asset.content_type, headers=headers)
+    return Response(asset.body, media_type=asset.content_type, headers=headers)
+
+
+_bundle = None
+_bundle_lock = threading.Lock()
+
+
+def get_bundle(frontend_dir: str) -> AssetBundle:
+    """The asset bundle, built on first use (or by the lifespan hook)."""
+    global _bundle
+    if _bundle is None:
+        with _bundle_lock:
+            if _bundle is None:
+                _bundle = AssetBundle(frontend_dir)
+    return _bundle
@@ -0,0 +1,63 @@
+"""
+summaries.py — Backfill and verify the practice/sequence summary columns.
+Triggers keep pose_count, total_seconds, max_difficulty and category_mix
+current; this checks them against the pose rows and repairs any drift:
+
+    python backend/summaries.py check [--db PATH]      # exit 1 on drift
+    python backend/summaries.py backfill [--db PATH]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import SUMMARY_TABLES, get_connection, init_db, refresh_summaries, stale_summaries
+
+MAX_LISTED_IDS = 20
+
+
+def check(conn) -> dict:
+    """{table: [stale ids]} for every summarised table."""
+    return {summary[0]: stale_summaries(conn, *summary) for summary in SUMMARY_TABLES}
+
+
+def backfill(conn) -> dict:
+    """Recompute every summary in one transaction. Returns {table: rows}."""
+    with conn:
+        return {summary[0]: refresh_summaries(conn, *summary) for summary in SUMMARY_TABLES}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check or rebuild practice/sequence summary columns")
+    parser.add_argument("command", choices=("check", "backfill"))
+    parser.add_argument("--db", help="database path (default: ASANA_DB_PATH or asana_studio.db)")
+    args = parser.parse_args(argv)
+
+    init_db(args.db)   # adds the columns and triggers to older databases
+    conn = get_connection(args.db)
+    try:
+        start = time.perf_counter()
+        if args.command == "backfill":
+            for table, rows in backfill(conn).items():
+                print(f"✅ Recomputed {rows:,} {table}")
+            print(f"Done in {time.perf_counter() - start:.1f}s")
+            return 0
+
+        drifted = 0
+        for table, ids in check(conn).items():
+            drifted += len(ids)
+            if ids:
+                shown = ", ".join(map(str, ids[:MAX_LISTED_IDS]))
+                more = f" (+{len(ids) - MAX_LISTED_IDS} more)" if len(ids) > MAX_LISTED_IDS else ""
+                print(f"❌ {len(ids):,} stale {table}: {shown}{more}")
+            else:
+                print(f"✅ {table} summaries consistent")
+        return 1 if drifted else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
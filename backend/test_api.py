@@ -113,6 +113,112 @@ class TestSequences:
             })
             assert r.status_code == 200
 
+    def test_generation_respects_ceilings(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        data = client.post("/api/sequences/generate", json={
+            "style": "power", "duration_minutes": 30, "difficulty": 2,
+        }).json()
+        ids = [p["pose_id"] for p in data["poses"] if p["side"] != "right"]
+        assert len(ids) == len(set(ids))
+        for p in data["poses"]:
+            ceiling = {"warmup": 1, "peak": 2, "cooldown": 2}[p["phase"]]
+            if p["pose_id"] != catalog.by_slug["corpse-pose"].id:
+                assert catalog.by_id[p["pose_id"]].difficulty <= ceiling
+
+    def test_sampler_skips_excluded(self):
+        import random
+        from catalog import get_catalog
+        from routers.sequences import _candidate_pools, _sample_poses
+        pool = _candidate_pools(get_catalog())["hip_opener", "peak"]
+        excluded = {p.id for p in pool.poses[::2]}
+        picked = _sample_poses(pool, 5, excluded, 1000, random.Random(1))
+        assert len(picked) == len(pool.poses) - len(excluded)
+        assert not excluded & {p.id for p in picked}
+
+    def test_exact_planner_hits_duration(self):
+        for style, minutes in (("morning_flow", 15), ("power", 45), ("hip_opener", 30)):
+            data = client.post("/api/sequences/generate", json={
+                "style": style, "duration_minutes": minutes, "difficulty": 3, "planner": "exact",
+            }).json()
+            assert data["planner"] == "exact"
+            total = sum(p["hold_seconds"] for p in data["poses"])
+            assert abs(total - minutes * 60) <= 30
+            phases = [p["phase"] for p in data["poses"]]
+            assert phases == sorted(phases, key=["warmup", "peak", "cooldown"].index)
+
+    def test_exact_planner_reports_shortfall(self):
+        from routers.sequences import STYLE_TEMPLATES
+        specs = [{"style": style, "duration_minutes": minutes, "difficulty": difficulty,
+                  "planner": "exact", "seed": 3}
+                 for style in STYLE_TEMPLATES for minutes in (90, 180) for difficulty in (1, 3)]
+        results = client.post("/api/sequences/generate/batch", json=specs).json()["results"]
+        shortfalls = {}
+        for spec, result in zip(specs, results):
+            data = result["sequences"][0]
+            total = sum(p["hold_seconds"] for p in data["poses"])
+            assert data["target_minutes"] == spec["duration_minutes"]
+            assert data["shortfall_minutes"] == round(max(0, spec["duration_minutes"] * 60 - total) / 60, 1)
+            if not data["shortfall_minutes"]:
+                assert abs(total - spec["duration_minutes"] * 60) <= 30
+            shortfalls[spec["style"], spec["duration_minutes"], spec["difficulty"]] = data["shortfall_minutes"]
+        # Gentle restorative poses can't fill three hours
+        assert shortfalls["restorative", 180, 1] > 60
+
+    def test_optimized_flow_lowers_transition_cost(self):
+        from catalog import get_catalog
+        from transitions import transition_graph
+        graph = transition_graph(get_catalog())
+        spec = {"style": "full_body", "duration_minutes": 30, "difficulty": 3, "seed": 7}
+        plain, optimized = client.post("/api/sequences/generate/batch", json=[
+            spec, dict(spec, flow="optimized"),
+        ]).json()["results"]
+
+        def cost(seq):
+            ids = [p["pose_id"] for p in seq["poses"] if p["side"] != "right"]
+            return graph.path_cost(ids)
+
+        plain, optimized = plain["sequences"][0], optimized["sequences"][0]
+        assert optimized["flow"] == "optimized"
+        assert sorted(p["pose_id"] for p in optimized["poses"]) == sorted(p["pose_id"] for p in plain["poses"])
+        assert cost(optimized) < cost(plain)
+
+    def test_optimized_flow_is_seeded(self):
+        specs = [{"style": "full_body", "duration_minutes": minutes, "difficulty": 3,
+                  "seed": 42, "count": 2, "flow": "optimized"} for minutes in (60, 150)]
+        first = client.post("/api/sequences/generate/batch", json=specs).json()
+        second = client.post("/api/sequences/generate/batch", json=specs).json()
+        assert first["results"] == second["results"]
+
+    def test_batch_generation_is_seeded(self):
+        specs = [
+            {"style": "power", "duration_minutes": 20, "difficulty": 4, "seed": 42, "count": 3},
+            {"style": "restorative", "duration_minutes": 15, "difficulty": 2},
+        ]
+        first = client.post("/api/sequences/generate/batch", json=specs).json()
+        second = client.post("/api/sequences/generate/batch", json=specs).json()
+        assert len(first["results"][0]["sequences"]) == 3
+        assert first["results"][0] == second["results"][0]
+        assert isinstance(first["results"][1]["seed"], int)
+
+        reseeded = dict(specs[1], seed=first["results"][1]["seed"])
+        replay = client.post("/api/sequences/generate/batch", json=[reseeded]).json()
+        assert replay["results"][0]["sequences"] == first["results"][1]["sequences"]
+
+    def test_batch_rejects_unknown_style(self):
+        r = client.post("/api/sequences/generate/batch", json=[{"style": "nope"}])
+        assert r.status_code == 400
+
+    def test_duration_bounds(self):
+        from routers.sequences import MAX_DURATION_MINUTES
+        for minutes in (-5, 0, MAX_DURATION_MINUTES + 1):
+            r = client.post("/api/sequences/generate", json={"duration_minutes": minutes})
+            assert r.status_code == 422, minutes
+            r = client.post("/api/sequences/generate/batch", json=[{"duration_minutes": minutes}])
+            assert r.status_code == 422, minutes
+        r = client.post("/api/sequences/generate", json={"duration_minutes": MAX_DURATION_MINUTES})
+        assert r.status_code == 200
+
     def test_save_and_load(self):
         # Generate
         r = client.post("/api/sequences/generate", json={
@@ -139,6 +245,15 @@ class TestSequences:
         assert data["name"] == "Test Sequence"
         assert len(data["poses"]) > 0
 
+        # List with server-side filters
+        listed = client.get("/api/sequences?style=full_body&difficulty=2&name=Test").json()["sequences"]
+        assert listed[0]["id"] == seq_id
+        assert listed[0]["pose_count"] == len(data["poses"])
+        assert listed[0]["total_seconds"] == sum(p["hold_seconds"] for p in data["poses"])
+        assert all(s["style"] == "full_body" for s in listed)
+        ids = [s["id"] for s in client.get("/api/sequences?style=power").json()["sequences"]]
+        assert seq_id not in ids
+
 
 class TestPractices:
     def test_crud(self):
@@ -178,3 +293,753 @@ class TestPractices:
         # Verify delete
         r = client.get(f"/api/practices/{pid}")
         assert r.status_code == 404
+
+    def test_update_writes_only_changes(self):
+        poses = [{"pose_id": i, "position": i, "side": "both", "hold_seconds": 30} for i in range(1, 11)]
+        pid = client.post("/api/practices", json={"name": "Diff", "poses": poses}).json()["id"]
+        row_ids = {p["pose_id"]: p["id"] for p in client.get(f"/api/practices/{pid}").json()["poses"]}
+
+        # Change one hold, swap two poses, drop one, add one
+        edited = [dict(p) for p in poses if p["pose_id"] != 10]
+        edited[0]["hold_seconds"] = 60
+        edited[1]["position"], edited[2]["position"] = 3, 2
+        edited.append({"pose_id": 11, "position": 10, "side": "both", "hold_seconds": 30})
+        r = client.put(f"/api/practices/{pid}", json={"poses": edited})
+        assert r.json()["changes"] == {"inserted": 1, "removed": 1, "moved": 2, "changed": 1}
+
+        data = client.get(f"/api/practices/{pid}").json()
+        assert [p["pose_id"] for p in data["poses"]] == [1, 3, 2, 4, 5, 6, 7, 8, 9, 11]
+        assert data["poses"][0]["hold_seconds"] == 60
+        kept = {p["pose_id"]: p["id"] for p in data["poses"]}
+        assert all(kept[i] == row_ids[i] for i in range(1, 10))
+        client.delete(f"/api/practices/{pid}")
+
+    def test_failed_write_rolls_back(self):
+        r = client.post("/api/practices", json={"name": "Bad", "poses": [
+            {"pose_id": 1, "position": 1}, {"pose_id": 999999, "position": 2},
+        ]})
+        assert r.status_code == 400
+        names = [p["name"] for p in client.get("/api/practices?name=Bad").json()["practices"]]
+        assert "Bad" not in names
+
+        poses = [{"pose_id": 1, "position": 1}, {"pose_id": 2, "position": 2}]
+        pid = client.post("/api/practices", json={"name": "Keep", "poses": poses}).json()["id"]
+        r = client.put(f"/api/practices/{pid}", json={"name": "Renamed", "poses": [
+            {"pose_id": 3, "position": 1}, {"pose_id": 999999, "position": 2},
+        ]})
+        assert r.status_code == 400
+        data = client.get(f"/api/practices/{pid}").json()
+        assert data["name"] == "Keep"
+        assert [p["pose_id"] for p in data["poses"]] == [1, 2]
+        client.delete(f"/api/practices/{pid}")
+
+    def test_list_pages_newest_first_with_summaries(self):
+        ids = [client.post("/api/practices", json={"name": f"Paged {i}", "poses": [
+            {"pose_id": 1, "position": 1, "hold_seconds": 20},
+            {"pose_id": 2, "position": 2, "hold_seconds": 40},
+        ]}).json()["id"] for i in range(5)]
+        client.put(f"/api/practices/{ids[0]}", json={"poses": [{"pose_id": 3, "position": 1}]})
+
+        seen, cursor = [], None
+        while True:
+            data = client.get("/api/practices", params={"name": "Paged", "per_page": 2,
+                                                       "cursor": cursor}).json()
+            seen += data["practices"]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        assert [p["id"] for p in seen] == ids[::-1]
+        assert seen[-1]["pose_count"] == 1 and seen[-1]["total_seconds"] == 30
+        assert seen[0]["pose_count"] == 2 and seen[0]["total_seconds"] == 60
+        assert client.get("/api/practices?name=Paged_").json()["practices"] == []
+        assert client.get("/api/practices?cursor=bogus").status_code == 400
+        from pagination import encode_cursor
+        for position in (["t", [1], 1], ["t", None, 1], ["t", "2020", True], ["t", "2020"]):
+            for url in ("/api/practices", "/api/sequences"):
+                r = client.get(url, params={"cursor": encode_cursor(position)})
+                assert r.status_code == 400, (url, position)
+        for pid in ids:
+            client.delete(f"/api/practices/{pid}")
+
+    def test_summary_columns_backfilled_on_old_schema(self, tmp_path):
+        import sqlite3
+        from database import init_db
+        path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE practices (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                                    created_at TEXT DEFAULT (datetime('now')));
+            CREATE TABLE practice_poses (id INTEGER PRIMARY KEY AUTOINCREMENT, practice_id INTEGER NOT NULL,
+                                         pose_id INTEGER NOT NULL, position INTEGER NOT NULL,
+                                         side TEXT DEFAULT 'both', hold_seconds INTEGER NOT NULL DEFAULT 30);
+            INSERT INTO practices (name) VALUES ('Old'), ('Empty');
+            INSERT INTO practice_poses (practice_id, pose_id, position, hold_seconds) VALUES (1, 1, 1, 30), (1, 2, 2, 15);
+        """)
+        conn.close()
+        init_db(path)
+        conn = sqlite3.connect(path)
+        rows = conn.execute("SELECT name, pose_count, total_seconds FROM practices ORDER BY id").fetchall()
+        conn.close()
+        assert rows == [("Old", 2, 45), ("Empty", 0, 0)]
+
+
+class TestSummaries:
+    def test_triggers_track_pose_rows(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        a, b = catalog.by_id[1], catalog.poses[-1]
+        pid = client.post("/api/practices", json={"name": "Summary", "poses": [
+            {"pose_id": a.id, "position": 1, "hold_seconds": 30},
+            {"pose_id": b.id, "position": 2, "hold_seconds": 45},
+        ]}).json()["id"]
+        data = client.get(f"/api/practices/{pid}").json()
+        assert data["max_difficulty"] == max(a.difficulty, b.difficulty)
+        mix = {a.category: 1}
+        mix[b.category] = mix.get(b.category, 0) + 1
+        assert data["category_mix"] == mix
+
+        client.put(f"/api/practices/{pid}", json={"poses": [{"pose_id": a.id, "position": 1}]})
+        data = client.get(f"/api/practices/{pid}").json()
+        assert (data["pose_count"], data["total_seconds"]) == (1, 30)
+        assert data["max_difficulty"] == a.difficulty
+        assert data["category_mix"] == {a.category: 1}
+        client.delete(f"/api/practices/{pid}")
+
+    def test_incremental_triggers_match_full_recompute(self):
+        import random
+        from catalog import get_catalog
+        from summaries import check
+        catalog = get_catalog()
+        hardest = max(catalog.poses, key=lambda p: p.difficulty)
+        easy = [p.id for p in catalog.poses if p.difficulty < hardest.difficulty]
+        rng = random.Random(7)
+        rows = [{"pose_id": hardest.id, "position": 0}] + [
+            {"pose_id": rng.choice(easy), "position": i, "hold_seconds": rng.choice((15, 30))}
+            for i in range(1, 40)
+        ]
+        pid = client.post("/api/practices", json={"name": "Deltas", "poses": rows}).json()["id"]
+        assert client.get(f"/api/practices/{pid}").json()["max_difficulty"] == hardest.difficulty
+
+        # Dropping the only hardest pose rescans; edits and moves apply as deltas
+        rows = rows[1:]
+        rows[0]["hold_seconds"] = 90
+        rows[1]["pose_id"] = rng.choice(easy)
+        client.put(f"/api/practices/{pid}", json={"poses": rows})
+        data = client.get(f"/api/practices/{pid}").json()
+        assert data["max_difficulty"] == max(catalog.by_id[r["pose_id"]].difficulty for r in rows)
+        assert data["total_seconds"] == sum(r.get("hold_seconds", 30) for r in rows)
+        conn = get_connection()
+        assert check(conn) == {"practices": [], "sequences": []}
+        conn.close()
+        client.delete(f"/api/practices/{pid}")
+
+    def test_check_and_backfill(self, tmp_path):
+        import summaries
+        path = str(tmp_path / "summaries.db")
+        init_db(path)
+        conn = get_connection(path)
+        with conn:
+            conn.execute("INSERT INTO poses (id, english_name, slug, category, difficulty) "
+                         "VALUES (1, 'A', 'a', 'Standing', 2), (2, 'B', 'b', 'Seated', 4)")
+            conn.execute("INSERT INTO practices (id, name) VALUES (1, 'P')")
+            conn.execute("INSERT INTO practice_poses (practice_id, pose_id, position) VALUES (1, 1, 1), (1, 2, 2)")
+            # A pose moving category (e.g. on re-seed) refreshes the practices using it
+            conn.execute("UPDATE poses SET category = 'Balance' WHERE id = 2")
+        assert summaries.check(conn) == {"practices": [], "sequences": []}
+        row = conn.execute("SELECT max_difficulty, category_mix FROM practices").fetchone()
+        assert tuple(row) == (4, '{"Balance":1,"Standing":1}')
+
+        with conn:
+            conn.execute("UPDATE practices SET pose_count = 0, category_mix = '{}'")
+        assert summaries.check(conn)["practices"] == [1]
+        assert summaries.main(["check", "--db", path]) == 1
+        assert summaries.main(["backfill", "--db", path]) == 0
+        assert summaries.check(conn)["practices"] == []
+        conn.close()
+
+
+class TestLibraryExport:
+    def test_formats_cover_every_item(self):
+        import csv, io, json
+        rows = [{"pose_id": 1, "position": 1, "hold_seconds": 20},
+                {"pose_id": 2, "position": 2, "side": "left", "hold_seconds": 40}]
+        pid = client.post("/api/practices", json={"name": "Export Me", "poses": rows}).json()["id"]
+        sid = client.post("/api/sequences", json={"name": "Export Seq", "style": "power",
+                                                  "difficulty": 4, "poses": rows}).json()["id"]
+
+        r = client.get("/api/library/export")
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        items = [json.loads(line) for line in r.text.splitlines()]
+        practices = {i["id"] for i in items if i["kind"] == "practice"}
+        conn = get_connection()
+        assert practices == {row[0] for row in conn.execute("SELECT id FROM practices")}
+        conn.close()
+        practice = next(i for i in items if i["kind"] == "practice" and i["id"] == pid)
+        assert [p["pose_id"] for p in practice["poses"]] == [1, 2]
+        assert practice["total_seconds"] == 60
+        assert practice["category_mix"] == client.get(f"/api/practices/{pid}").json()["category_mix"]
+
+        r = client.get("/api/library/export?format=csv&kind=sequences")
+        assert 'filename="asana-library.csv"' in r.headers["content-disposition"]
+        table = list(csv.DictReader(io.StringIO(r.text)))
+        mine = [row for row in table if row["item_id"] == str(sid)]
+        assert {row["kind"] for row in table} == {"sequence"}
+        assert [(row["position"], row["side"], row["hold_seconds"]) for row in mine] == [
+            ("1", "both", "20"), ("2", "left", "40")]
+
+        text = client.get("/api/library/export?format=text&kind=sequences").text
+        single = client.get(f"/api/sequences/{sid}/export?format=text").json()["text"]
+        assert single in text and "Style: power" in single
+        assert client.get("/api/library/export?format=xml").status_code == 422
+        client.delete(f"/api/practices/{pid}")
+
+    def test_csv_keeps_items_without_poses(self):
+        import csv, io
+        pid = client.post("/api/practices", json={"name": "Empty Export", "poses": []}).json()["id"]
+        r = client.get("/api/library/export?format=csv&kind=practices")
+        rows = [row for row in csv.DictReader(io.StringIO(r.text)) if row["item_id"] == str(pid)]
+        assert len(rows) == 1
+        assert rows[0]["item_name"] == "Empty Export"
+        assert rows[0]["pose_id"] == "" and rows[0]["position"] == ""
+        client.delete(f"/api/practices/{pid}")
+
+    def test_batches_resume_after_last_id(self):
+        import asyncio, json
+        from routers.library import _stream
+        ids = [client.post("/api/practices", json={"name": f"Batch {i}", "poses": []}).json()["id"]
+               for i in range(3)]
+
+        async def collect():
+            return [chunk async for chunk in _stream(("practices",), "ndjson", batch_size=2)]
+
+        chunks = asyncio.run(collect())
+        seen = [json.loads(line)["id"] for chunk in chunks for line in chunk.splitlines()]
+        assert seen == sorted(seen) and set(ids) <= set(seen)
+        assert all(len(chunk.splitlines()) <= 2 for chunk in chunks)
+        for pid in ids:
+            client.delete(f"/api/practices/{pid}")
+
+
+class TestLibraryImport:
+    def test_import_reports_bad_records_and_commits_the_rest(self):
+        import json
+        lines = [
+            json.dumps({"kind": "practice", "name": "Imported P", "created_at": "2020-01-02 03:04:05",
+                        "poses": [{"pose_id": 1, "hold_seconds": 20}, {"pose_id": 2, "side": "left"}]}),
+            json.dumps({"kind": "sequence", "name": "Imported S", "style": "power", "difficulty": 4,
+                        "poses": [{"pose_id": 3, "position": 1}]}),
+            json.dumps({"kind": "practice", "name": "Bad pose", "poses": [{"pose_id": 999999}]}),
+            "{not json",
+            json.dumps({"kind": "playlist", "name": ""}),
+        ]
+        r = client.post("/api/library/import", content="\n".join(lines),
+                        headers={"Content-Type": "application/x-ndjson"})
+        data = r.json()
+        assert r.status_code == 200
+        assert data["imported"] == {"sequences": 1, "practices": 1}
+        assert (data["valid"], data["failed"]) == (2, 3)
+        assert [e["record"] for e in data["errors"]] == [3, 4, 5]
+        assert data["errors"][0]["errors"] == ["poses: unknown pose_id 999999"]
+        assert len(data["errors"][2]["errors"]) == 2
+        assert data["records_per_second"] > 0
+
+        practice = client.get("/api/practices?name=Imported").json()["practices"][0]
+        assert practice["created_at"] == "2020-01-02 03:04:05"
+        assert (practice["pose_count"], practice["total_seconds"]) == (2, 50)
+        poses = client.get(f"/api/practices/{practice['id']}").json()["poses"]
+        assert [(p["position"], p["side"]) for p in poses] == [(1, "both"), (2, "left")]
+        seq = client.get("/api/sequences?name=Imported").json()["sequences"][0]
+        assert (seq["style"], seq["difficulty"], seq["pose_count"]) == ("power", 4, 1)
+        client.delete(f"/api/practices/{practice['id']}")
+
+    def test_export_round_trips_through_import(self):
+        import json
+        from summaries import check
+        pid = client.post("/api/practices", json={"name": "Round Trip", "poses": [
+            {"pose_id": 4, "position": 1, "hold_seconds": 45}]}).json()["id"]
+        exported = [json.loads(line) for line in
+                    client.get("/api/library/export?kind=practices").text.splitlines()]
+        original = next(i for i in exported if i["id"] == pid)
+
+        r = client.post("/api/library/import?dry_run=true", json=[original])
+        assert r.json()["valid"] == 1 and r.json()["imported"] == {"sequences": 0, "practices": 0}
+        r = client.post("/api/library/import", json=[original, original])
+        assert r.json()["imported"]["practices"] == 2
+
+        copies = client.get("/api/practices?name=Round Trip").json()["practices"]
+        assert len(copies) == 3
+        for copy in copies:
+            assert {k: copy[k] for k in ("pose_count", "total_seconds", "max_difficulty", "category_mix")} == \
+                {k: original[k] for k in ("pose_count", "total_seconds", "max_difficulty", "category_mix")}
+        conn = get_connection()
+        assert check(conn) == {"practices": [], "sequences": []}
+        conn.close()
+        for copy in copies:
+            client.delete(f"/api/practices/{copy['id']}")
+
+    def test_rejects_unparseable_body(self):
+        assert client.post("/api/library/import", content=b"[1, 2",
+                           headers={"Content-Type": "application/json"}).status_code == 400
+        assert client.post("/api/library/import", content=b"\xff\xfe",
+                           headers={"Content-Type": "application/x-ndjson"}).status_code == 400
+
+
+class TestConnectionPool:
+    def test_health_reports_pool(self):
+        data = client.get("/health").json()
+        pool = data["db_pool"]
+        assert pool["in_use"] == 0
+        assert pool["open"] <= pool["size"]
+
+    def test_connection_returned_on_error(self):
+        from database import pool_stats
+        before = pool_stats()
+        for _ in range(before["size"] + 2):
+            assert client.get("/api/practices/999999").status_code == 404
+        after = pool_stats()
+        assert after["in_use"] == 0
+        assert after["open"] <= after["size"]
+
+
+class TestCatalog:
+    def test_catalog_matches_database(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        conn = get_connection()
+        count = conn.execute("SELECT COUNT(*) FROM poses").fetchone()[0]
+        savasana = conn.execute("SELECT * FROM poses WHERE slug = 'corpse-pose'").fetchone()
+        conn.close()
+        assert len(catalog) == count
+        assert catalog.by_slug["corpse-pose"].id == savasana["id"]
+
+    def test_variations_and_parent(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        parent_id = next(iter(catalog.by_parent))
+        data = client.get(f"/api/poses/{parent_id}").json()
+        assert len(data["variations"]) == 2
+        child = client.get(f"/api/poses/{data['variations'][0]['id']}").json()
+        assert child["parent"]["id"] == parent_id
+
+    def test_listing_order(self):
+        poses = client.get("/api/poses?per_page=200").json()["poses"]
+        keys = [(p["category"], p["difficulty"], p["english_name"]) for p in poses]
+        assert keys == sorted(keys)
+
+
+class TestSearch:
+    def test_prefix_search(self):
+        data = client.get("/api/poses?q=pige&per_page=20").json()
+        assert data["total"] >= 5
+        assert "Pigeon" in data["poses"][0]["english_name"]
+
+    def test_diacritic_insensitive(self):
+        plain = client.get("/api/poses?q=tadasana").json()
+        accented = client.get("/api/poses?q=Tāḍāsana").json()
+        assert plain["total"] > 0
+        assert [p["id"] for p in accented["poses"]] == [p["id"] for p in plain["poses"]]
+
+    def test_search_combines_with_filters(self):
+        data = client.get("/api/poses?q=warrior&category=Standing").json()
+        assert data["total"] > 0
+        assert all(p["category"] == "Standing" for p in data["poses"])
+
+    def test_punctuation_only_query(self):
+        data = client.get('/api/poses?q="*').json()
+        assert data["total"] == 0
+
+
+class TestCursorPagination:
+    def _walk(self, params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, per_page=37, include_total="false")
+            if cursor:
+                query["cursor"] = cursor
+            data = client.get("/api/poses", params=query).json()
+            assert data["total"] is None
+            ids.extend(p["id"] for p in data["poses"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                return ids
+
+    def test_cursor_walk_matches_full_listing(self):
+        full = client.get("/api/poses?per_page=200").json()
+        rest = client.get("/api/poses?per_page=200&page=2").json()
+        expected = [p["id"] for p in full["poses"] + rest["poses"]]
+        assert self._walk({}) == expected
+        assert len(expected) == full["total"]
+
+    def test_cursor_walk_with_filters(self):
+        expected = [p["id"] for p in client.get("/api/poses?tag=standing&per_page=200").json()["poses"]]
+        assert self._walk({"tag": "standing"}) == expected
+
+    def test_cursor_walk_with_search(self):
+        expected = [p["id"] for p in client.get("/api/poses?q=pose&per_page=200").json()["poses"]]
+        assert self._walk({"q": "pose"}) == expected
+
+    def test_invalid_cursor(self):
+        r = client.get("/api/poses?cursor=not-a-cursor")
+        assert r.status_code == 400
+        from pagination import encode_cursor
+        for position in (["k", "Standing", "x", "y", 1], ["k", None, 1, "a", 1], ["k", 1, 2, 3, 4],
+                         ["k", "Standing", True, "a", 1], ["r", True], ["r", -1]):
+            r = client.get("/api/poses", params={"cursor": encode_cursor(position),
+                                                 "q": "warrior" if position[0] == "r" else None})
+            assert r.status_code == 400, position
+
+
+class TestSeeding:
+    def test_artifact_restores_fresh_install(self, tmp_path):
+        from build_seed_db import build
+        from seed_poses import ensure_seeded, seed_hash
+        from database import get_meta
+        artifact = str(tmp_path / "seed.db")
+        build(artifact)
+
+        db_path = str(tmp_path / "fresh.db")
+        ensure_seeded(db_path, artifact_path=artifact)
+        conn = get_connection(db_path)
+        assert get_meta(conn, "seed_hash") == seed_hash()
+        assert conn.execute("SELECT COUNT(*) FROM poses").fetchone()[0] >= 300
+        assert conn.execute("SELECT COUNT(*) FROM poses_fts").fetchone()[0] >= 300
+        conn.close()
+
+    def test_reseed_keeps_pose_ids(self, tmp_path, monkeypatch):
+        import seed_poses
+        db_path = str(tmp_path / "reseed.db")
+        seed_poses.seed_database(db_path)
+        conn = get_connection(db_path)
+        before = dict(conn.execute("SELECT slug, id FROM poses").fetchall())
+
+        extra = ("Test Flow Pose", None, "Standing", 1, 30, True, ["standing"], "Test.")
+        monkeypatch.setattr(seed_poses, "POSES", seed_poses.POSES + [extra])
+        seed_poses.seed_database(db_path)
+        after = dict(conn.execute("SELECT slug, id FROM poses").fetchall())
+        conn.close()
+        assert all(after[slug] == pose_id for slug, pose_id in before.items())
+        assert {"test-flow-pose", "test-flow-pose-left", "test-flow-pose-right"} <= set(after)
+
+
+class TestHttpCaching:
+    def test_etag_revalidation(self):
+        for url in ("/api/poses?category=Standing", "/api/poses/1", "/api/poses/categories",
+                    "/api/poses/tags", "/api/sequences/styles"):
+            r = client.get(url)
+            assert r.status_code == 200
+            assert "max-age" in r.headers["cache-control"]
+            etag = r.headers["etag"]
+            r = client.get(url, headers={"If-None-Match": etag})
+            assert r.status_code == 304
+            assert r.content == b""
+
+    def test_etag_changes_with_catalog_version(self):
+        import catalog
+        etag = client.get("/api/poses/categories").headers["etag"]
+        conn = get_connection()
+        conn.execute("UPDATE poses SET description = description WHERE id = 1")
+        conn.commit()
+        conn.close()
+        catalog._next_check = 0  # skip the re-check interval
+        r = client.get("/api/poses/categories", headers={"If-None-Match": etag})
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+
+    def test_etag_changes_with_catalog_content(self, tmp_path):
+        from catalog import read_catalog
+        from database import get_meta, set_meta
+        from http_cache import catalog_etag
+        # Same version counter, different pose content
+        edited = str(tmp_path / "edited.db")
+        source, conn = get_connection(), get_connection(edited)
+        source.backup(conn)
+        source.close()
+        version = get_meta(conn, "version")
+        conn.execute("UPDATE poses SET description = 'Edited' WHERE id = 1")
+        set_meta(conn, "version", version)
+        conn.commit()
+        conn.close()
+
+        readers = [get_connection(), get_connection(edited)]
+        original, changed = (read_catalog(conn) for conn in readers)
+        for conn in readers:
+            conn.close()
+        assert original.version == changed.version
+        assert catalog_etag(original) != catalog_etag(changed)
+
+
+class TestResponseCache:
+    def test_repeat_query_hits_cache(self):
+        from routers.poses import list_cache
+        client.get("/api/poses?category=Seated&per_page=13")
+        before = list_cache.stats()
+        r = client.get("/api/poses?category=Seated&per_page=13")
+        assert r.status_code == 200
+        assert r.json()["poses"][0]["category"] == "Seated"
+        assert list_cache.stats()["hits"] == before["hits"] + 1
+        assert "pose_list_cache" in client.get("/health").json()
+
+    def test_lru_byte_budget(self):
+        from cache import ResponseCache
+        cache = ResponseCache(max_bytes=10)
+        for key in "abc":
+            cache.get_or_compute(key, lambda: b"xxxx")
+        stats = cache.stats()
+        assert stats["entries"] == 2 and stats["evictions"] == 1
+        assert cache.get_or_compute("c", lambda: b"changed") == b"xxxx"
+
+    def test_single_flight(self):
+        import threading, time
+        from cache import ResponseCache
+        cache = ResponseCache(max_bytes=1024)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return b"body"
+
+        threads = [threading.Thread(target=cache.get_or_compute, args=("k", compute)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert cache.stats()["coalesced"] + cache.stats()["hits"] == 7
+
+
+class TestMetrics:
+    def test_route_templates_and_gauges(self):
+        client.get("/api/poses/1")
+        client.get("/api/practices")
+        body = client.get("/metrics").text
+        assert 'asana_http_requests_total{method="GET",route="/api/poses/{pose_id}",status="200"}' in body
+        assert 'asana_http_request_duration_seconds_bucket{method="GET",route="/api/poses/{pose_id}",le="+Inf"}' in body
+        assert 'asana_db_query_duration_seconds_count{site="list_practices"}' in body
+        for gauge in ("asana_db_pool_", "asana_pose_list_cache_hits", "asana_catalog_version"):
+            assert gauge in body
+
+
+class TestBenchmarkHarness:
+    def test_summary_percentiles(self):
+        from benchmarks.harness import summarize
+        s = summarize([i / 1000 for i in range(1, 101)], wall_seconds=2.0)
+        assert (s["p50_ms"], s["p95_ms"], s["p99_ms"]) == (50, 95, 99)
+        assert s["ops_per_sec"] == 50
+
+    def test_compare_flags_regressions(self):
+        from benchmarks.harness import compare
+        baseline = {"results": {"a": {"p50_ms": 1.0, "p95_ms": 2.0}, "b": {"p50_ms": 1.0, "p95_ms": 2.0}}}
+        results = {"a": {"p50_ms": 1.1, "p95_ms": 2.1}, "b": {"p50_ms": 1.5, "p95_ms": 2.0}}
+        assert [r[:2] for r in compare(results, baseline, threshold=0.2)] == [("b", "p50_ms")]
+
+
+class TestSyntheticData:
+    def test_build_small_dataset(self, tmp_path):
+        from benchmarks.synthetic import build
+        from catalog import PoseCatalog
+        path = str(tmp_path / "synthetic.db")
+        counts = build(path, poses=200, tags_per_pose=6, practices=50, sequences=20, poses_per_item=5)
+        assert counts["poses"] >= 300 + 200
+        assert counts["practice_poses"] == 250 and counts["sequence_poses"] == 100
+
+        conn = get_connection(path)
+        assert conn.execute("SELECT COUNT(*) FROM poses_fts").fetchone()[0] == counts["poses"]
+        triggers = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        assert {"poses_fts_insert", "pose_tags_version_insert", "practice_poses_summary_insert"} <= triggers
+        assert conn.execute("SELECT SUM(pose_count) FROM practices").fetchone()[0] == 250
+        rows = conn.execute("SELECT * FROM poses ORDER BY category, difficulty, english_name, id").fetchall()
+        tags = conn.execute("SELECT pose_id, tag FROM pose_tags ORDER BY id").fetchall()
+        conn.close()
+        assert len(PoseCatalog(rows, tags)) == counts["poses"]
+
+    def test_sparse_transition_graph_matches_dense(self, monkeypatch):
+        import transitions
+        from catalog import get_catalog
+        catalog = get_catalog()
+        dense = transitions.TransitionGraph(catalog)
+        monkeypatch.setattr(transitions, "MAX_DENSE_NODES", 0)
+        sparse = transitions.TransitionGraph(catalog)
+        assert sparse.costs is None
+        ids = [p.id for p in catalog.poses[::17]]
+        assert sparse.path_cost(ids) == pytest.approx(dense.path_cost(ids), rel=1e-5)
+
+
+class TestDBExecutor:
+    def test_back_pressure(self):
+        import asyncio, threading
+        from database import DBExecutor, PoolTimeout
+        executor = DBExecutor(workers=1, max_pending=1, timeout=0.05)
+        release = threading.Event()
+
+        async def scenario():
+            first = asyncio.ensure_future(executor.run(release.wait))
+            await asyncio.sleep(0.01)
+            with pytest.raises(PoolTimeout):
+                await executor.run(lambda: None)
+            release.set()
+            return await first
+
+        assert asyncio.run(scenario()) is True
+        stats = executor.stats()
+        assert stats["rejected"] == 1 and stats["pending"] == 0
+        executor.close()
+
+    def test_handlers_report_executor(self):
+        assert client.get("/api/practices").status_code == 200
+        assert client.get("/health").json()["db_executor"]["submitted"] > 0
+
+
+class TestFastJson:
+    def test_list_page_splices_cached_fragments(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        data = client.get("/api/poses?category=Standing&per_page=7&page=2").json()
+        expected = [p.to_dict() for p in catalog.poses if p.category == "Standing"][7:14]
+        assert data["poses"] == expected
+        assert data["total"] == catalog.category_bits["Standing"].bit_count()
+        record = catalog.by_id[expected[0]["id"]]
+        assert catalog.pose_json(record) is catalog.pose_json(record)
+
+    def test_encoder_matches_stdlib(self):
+        import json
+        from fast_json import dumps
+        payload = {"name": "Tāḍāsana", "tags": ["a", "b"], "n": None, "ok": True, "x": 3}
+        assert json.loads(dumps(payload)) == payload
+        assert dumps(payload) == json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def test_splice(self):
+        import json
+        from fast_json import splice
+        assert json.loads(splice({"a": 1}, b=b"[2]")) == {"a": 1, "b": [2]}
+        assert json.loads(splice({}, b=b"null")) == {"b": None}
+        assert json.loads(splice({"a": 1})) == {"a": 1}
+
+
+class TestBatchLookup:
+    def test_batch_matches_single_lookups(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        ids = [catalog.poses[5].id, catalog.poses[0].id, 999999, catalog.poses[5].id]
+        r = client.get("/api/poses/batch", params={"ids": ",".join(map(str, ids))})
+        assert r.status_code == 200
+        data = r.json()
+        assert data["missing"] == [999999]
+        assert [p["id"] for p in data["poses"]] == [ids[0], ids[1]]
+        assert data["poses"][0] == client.get(f"/api/poses/{ids[0]}").json()
+
+        # Repeated params work too, and revalidation is a 304
+        r2 = client.get(f"/api/poses/batch?ids={ids[0]}&ids={ids[1]},999999")
+        assert r2.json() == data
+        assert r2.headers["etag"] == r.headers["etag"]
+        assert client.get("/api/poses/batch", params={"ids": ids[0]},
+                          headers={"If-None-Match": r.headers["etag"]}).status_code == 200
+        assert client.get("/api/poses/batch", params={"ids": ",".join(map(str, ids))},
+                          headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+
+    def test_batch_rejects_bad_ids(self):
+        from routers.poses import MAX_BATCH_IDS
+        assert client.get("/api/poses/batch?ids=1,two").status_code == 400
+        too_many = ",".join(str(i) for i in range(1, MAX_BATCH_IDS + 2))
+        assert client.get(f"/api/poses/batch?ids={too_many}").status_code == 400
+        assert client.get("/api/poses/batch").status_code == 422
+
+    def test_expand_poses_on_saved_items(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        variant = next(p for p in catalog.poses if p.parent_pose_id)
+        rows = [{"pose_id": 1, "position": 1}, {"pose_id": variant.id, "position": 2}]
+        pid = client.post("/api/practices", json={"name": "Expand", "poses": rows}).json()["id"]
+        sid = client.post("/api/sequences", json={"name": "Expand", "style": "full_body",
+                                                  "poses": rows}).json()["id"]
+
+        for url in (f"/api/practices/{pid}", f"/api/sequences/{sid}"):
+            plain = client.get(url).json()
+            expanded = client.get(url, params={"expand": "poses"}).json()
+            assert "pose" not in plain["poses"][0]
+            assert [{k: v for k, v in p.items() if k != "pose"} for p in expanded["poses"]] == plain["poses"]
+            assert expanded["poses"][1]["pose"] == client.get(f"/api/poses/{variant.id}").json()
+            assert expanded["poses"][1]["pose"]["parent"]["id"] == variant.parent_pose_id
+            assert client.get(url, params={"expand": "bogus"}).status_code == 422
+        client.delete(f"/api/practices/{pid}")
+
+
+class TestStaticAssets:
+    def test_index_points_at_fingerprinted_assets(self):
+        import re
+        r = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200 and r.headers["cache-control"] == "no-cache"
+        urls = re.findall(r'src="(/js/[^"]+)"', r.text)
+        assert urls and all(re.search(r"\.[0-9a-f]{10}\.js$", u) for u in urls)
+
+        asset = client.get(urls[0], headers={"Accept-Encoding": "gzip, br;q=0"})
+        assert asset.headers["cache-control"].endswith("immutable")
+        assert asset.headers["content-encoding"] == "gzip"
+        logical = re.sub(r"\.[0-9a-f]{10}(\.js)$", r"\1", urls[0])
+        assert asset.content == client.get(logical, headers={"Accept-Encoding": "identity"}).content
+
+    def test_encoding_negotiation_and_revalidation(self):
+        plain = client.get("/css/style.css", headers={"Accept-Encoding": "gzip;q=0"})
+        assert "content-encoding" not in plain.headers
+        assert plain.headers["cache-control"] == "no-cache"
+        r = client.get("/css/style.css", headers={
+            "Accept-Encoding": "gzip;q=0", "If-None-Match": plain.headers["etag"],
+        })
+        assert r.status_code == 304
+        assert client.get("/css/missing.css").status_code == 404
+
+
+class TestTagBitmaps:
+    def test_boolean_tag_filters(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        r = client.get("/api/poses?tags_all=standing&tags_all=hip-opener&tags_any=backbend,twist"
+                       "&tags_none=balancing&per_page=200")
+        expected = [
+            p.id for p in catalog.poses
+            if {"standing", "hip-opener"} <= set(p.tags)
+            and {"backbend", "twist"} & set(p.tags) and "balancing" not in p.tags
+        ]
+        data = r.json()
+        assert expected and [p["id"] for p in data["poses"]] == expected
+        assert data["total"] == len(expected)
+
+    def test_tag_shorthand_and_cursor(self):
+        first = client.get("/api/poses?tag=hip-opener&tags_none=standing&per_page=10").json()
+        second = client.get(f"/api/poses?tags_all=hip-opener&tags_none=standing&per_page=10"
+                            f"&cursor={first['next_cursor']}").json()
+        ids = [p["id"] for p in first["poses"] + second["poses"]]
+        assert len(set(ids)) == 20
+        assert all("hip-opener" in p["tags"] and "standing" not in p["tags"]
+                   for p in first["poses"] + second["poses"])
+
+    def test_iter_bits(self):
+        from catalog import bitset, iter_bits
+        ordinals = [0, 3, 8, 9, 63, 64, 700]
+        bits = bitset(ordinals, 701)
+        assert list(iter_bits(bits)) == ordinals
+        assert list(iter_bits(bits, 9)) == [9, 63, 64, 700]
+
+
+class TestFacets:
+    def test_facets_follow_filters(self):
+        from catalog import get_catalog
+        catalog = get_catalog()
+        data = client.get("/api/poses?category=Standing&tags_all=hip-opener&facets=true&per_page=1").json()
+        facets = data["facets"]
+        hip = [p for p in catalog.poses if "hip-opener" in p.tags]
+        standing = [p for p in hip if p.category == "Standing"]
+        # Each facet ignores its own field's filter
+        assert {c["category"]: c["count"] for c in facets["category"]}["Standing"] == len(standing)
+        assert sum(c["count"] for c in facets["category"]) == len(hip)
+        assert sum(d["count"] for d in facets["difficulty"]) == data["total"] == len(standing)
+        tag_counts = {t["tag"]: t["count"] for t in facets["tag"]}
+        assert tag_counts["standing"] == sum(1 for p in catalog.poses
+                                             if p.category == "Standing" and "standing" in p.tags)
+        assert sum(facets["bilateral"].values()) == len(standing)
+
+    def test_facets_with_search(self):
+        data = client.get("/api/poses?q=warrior&facets=true").json()
+        assert data["total"] > 0
+        assert sum(c["count"] for c in data["facets"]["category"]) == data["total"]
+        assert "facets" not in client.get("/api/poses?q=warrior").json()
@@ -0,0 +1,133 @@
+"""
+transitions.py — Pose transition costs and flow-aware ordering.
+A cost graph over the catalog's top-level poses, built once per catalog
+snapshot, plus a nearest-neighbour + 2-opt ordering pass bounded by a
+fixed amount of work, so the same input always gives the same order.
+"""
+from array import array
+
+# Rough body height of each category: big jumps (standing → supine) cost more
+CATEGORY_LEVEL = {
+    "Standing": 4, "Balance": 4,
+    "Arm Balance": 3, "Inversion": 3,
+    "Kneeling": 2,
+    "Seated": 1, "Core": 1,
+    "Prone": 0, "Supine": 0, "Restorative": 0,
+}
+LEVEL_WEIGHT = 1.0
+CATEGORY_CHANGE_COST = 0.5
+TAG_WEIGHT = 1.0
+VARIATION_COST = 0.25   # between a pose and its own variations
+# Above this many top-level poses the n² matrix is too big; costs are computed per call
+MAX_DENSE_NODES = 2048
+
+
+class TransitionGraph:
+    """
+    Dense, symmetric cost matrix between top-level poses. Variations
+    (poses with a parent_pose_id) resolve to their parent's node. Catalogs
+    with more than MAX_DENSE_NODES roots skip the matrix and compute costs
+    on demand from the same per-node data.
+    """
+
+    def __init__(self, catalog):
+        roots = [p for p in catalog.poses if p.parent_pose_id is None]
+        self.node = {p.id: i for i, p in enumerate(roots)}
+        for p in catalog.poses:
+            if p.parent_pose_id is not None and p.parent_pose_id in self.node:
+                self.node[p.id] = self.node[p.parent_pose_id]
+
+        n = len(roots)
+        self.size = n
+        self.categories = [p.category for p in roots]
+        self.levels = [CATEGORY_LEVEL.get(p.category, 2) for p in roots]
+        self.tags = [frozenset(p.tags) for p in roots]
+        self.costs = None
+        if n <= MAX_DENSE_NODES:
+            costs = array("f", bytes(4 * n * n))
+            for i in range(n):
+                for j in range(i + 1, n):
+                    costs[i * n + j] = costs[j * n + i] = self._node_cost(i, j)
+            self.costs = costs
+
+    def _node_cost(self, i: int, j: int) -> float:
+        union = len(self.tags[i] | self.tags[j])
+        overlap = len(self.tags[i] & self.tags[j]) / union if union else 0.0
+        return (
+            LEVEL_WEIGHT * abs(self.levels[i] - self.levels[j])
+            + (CATEGORY_CHANGE_COST if self.categories[i] != self.categories[j] else 0.0)
+            + TAG_WEIGHT * (1.0 - overlap)
+        )
+
+    def cost(self, a_id: int, b_id: int) -> float:
+        i, j = self.node.get(a_id), self.node.get(b_id)
+        if i is None or j is None:
+            return LEVEL_WEIGHT * 4 + CATEGORY_CHANGE_COST + TAG_WEIGHT
+        if i == j:
+            return 0.0 if a_id == b_id else VARIATION_COST
+        if self.costs is None:
+            return self._node_cost(i, j)
+        return self.costs[i * self.size + j]
+
+    def path_cost(self, ids, start_id=None) -> float:
+        ids = ([start_id] if start_id is not None else []) + list(ids)
+        return sum(self.cost(a, b) for a, b in zip(ids, ids[1:]))
+
+
+_graph_snapshot = (None, None)
+
+
+def transition_graph(catalog) -> TransitionGraph:
+    """Graph for the given catalog snapshot, built on first use."""
+    global _graph_snapshot
+    built_for, graph = _graph_snapshot
+    if built_for is not catalog:
+        graph = TransitionGraph(catalog)
+        _graph_snapshot = (catalog, graph)
+    return graph
+
+
+def order_for_flow(graph: TransitionGraph, ids, start_id=None, max_checks=None) -> list:
+    """
+    Reorder pose ids to keep total transition cost low: nearest-neighbour
+    from `start_id` (the previous pose, if any), then 2-opt segment
+    reversals until no move helps or `max_checks` candidate moves have
+    been tried.
+    """
+    remaining = list(ids)
+    if len(remaining) < 2:
+        return remaining
+
+    path = []
+    current = start_id if start_id is not None else remaining.pop(0)
+    if start_id is None:
+        path.append(current)
+    while remaining:
+        nearest = min(range(len(remaining)), key=lambda k: graph.cost(current, remaining[k]))
+        current = remaining.pop(nearest)
+        path.append(current)
+
+    # 2-opt over an open path; a fixed start acts as a pinned node before path[0]
+    nodes = ([start_id] if start_id is not None else []) + path
+    first = 1 if start_id is not None else 0
+    cost = graph.cost
+    checks = 0
+    improved = True
+    while improved:
+        improved = False
+        for i in range(first, len(nodes) - 1):
+            checks += len(nodes) - i - 1
+            if max_checks is not None and checks > max_checks:
+                return nodes[first:]
+            for j in range(i + 1, len(nodes)):
+                before = after = 0.0
+                if i > 0:
+                    before += cost(nodes[i - 1], nodes[i])
+                    after += cost(nodes[i - 1], nodes[j])
+                if j + 1 < len(nodes):
+                    before += cost(nodes[j], nodes[j + 1])
+                    after += cost(nodes[i], nodes[j + 1])
+                if after < before - 1e-9:
+                    nodes[i:j + 1] = reversed(nodes[i:j + 1])
+                    improved = True
+    return nodes[first:]
@@ -17,6 +17,12 @@ const API = (() => {
         return res.json();
     }
 
+    // Drops unset params so an absent cursor isn't sent as "undefined"
+    function query(params) {
+        const set = Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== '');
+        return new URLSearchParams(set).toString();
+    }
+
     return {
         // Poses
         getPoses: (params = {}) => {
@@ -35,18 +41,23 @@ const API = (() => {
         saveSequence: (data) => request('/sequences', {
             method: 'POST', body: JSON.stringify(data),
         }),
-        getSequences: () => request('/sequences'),
-        getSequence: (id) => request(`/sequences/${id}`),
+        getSequences: (params = {}) => request(`/sequences?${query(params)}`),
+        getSequence: (id, params = {}) => request(`/sequences/${id}?${query(params)}`),
 
         // Practices
         createPractice: (data) => request('/practices', {
             method: 'POST', body: JSON.stringify(data),
         }),
-        getPractices: () => request('/practices'),
-        getPractice: (id) => request(`/practices/${id}`),
+        getPractices: (params = {}) => request(`/practices?${query(params)}`),
+        getPractice: (id, params = {}) => request(`/practices/${id}?${query(params)}`),
         updatePractice: (id, data) => request(`/practices/${id}`, {
             method: 'PUT', body: JSON.stringify(data),
         }),
         deletePractice: (id) => request(`/practices/${id}`, { method: 'DELETE' }),
+
+        // Library
+        importLibrary: (file) => request('/library/import', {
+            method: 'POST', body: file, headers: { 'Content-Type': 'application/x-ndjson' },
+        }),
     };
 })();
@@ -6,7 +6,6 @@ const PosesView = (() => {
     let debounceTimer = null;
 
     async function init() {
-        await loadFilters();
         await loadPoses();
         bindEvents();
     }
@@ -26,23 +25,29 @@ const PosesView = (() => {
         });
     }
 
-    async function loadFilters() {
-        const [categories, tags] = await Promise.all([
-            API.getCategories(),
-            API.getTags(),
-        ]);
-        const catSelect = document.getElementById('filter-category');
-        categories.forEach(c => {
-            catSelect.innerHTML += `<option value="${c.category}">${c.category} (${c.count})</option>`;
-        });
-        const tagSelect = document.getElementById('filter-tag');
-        tags.forEach(t => {
-            tagSelect.innerHTML += `<option value="${t.tag}">${t.tag} (${t.count})</option>`;
-        });
+    // Filter options come from the list response's facets: built on the
+    // first load, then relabelled with counts for the current filters.
+    function renderFacets(facets) {
+        fillSelect('filter-category', facets.category, 'category');
+        fillSelect('filter-tag', facets.tag, 'tag');
+    }
+
+    function fillSelect(id, counts, key) {
+        const select = document.getElementById(id);
+        if (select.options.length <= 1) {
+            counts.forEach(c => {
+                select.innerHTML += `<option value="${c[key]}">${c[key]} (${c.count})</option>`;
+            });
+            return;
+        }
+        const byValue = Object.fromEntries(counts.map(c => [c[key], c.count]));
+        for (const option of select.options) {
+            if (option.value) option.textContent = `${option.value} (${byValue[option.value] || 0})`;
+        }
     }
 
     function getFilters() {
-        const params = { page: currentPage, per_page: 48 };
+        const params = { page: currentPage, per_page: 48, facets: true };
         const q = document.getElementById('pose-search').value.trim();
         const cat = document.getElementById('filter-category').value;
         const diff = document.getElementById('filter-difficulty').value;
@@ -56,6 +61,7 @@ const PosesView = (() => {
 
     async function loadPoses() {
         const data = await API.getPoses(getFilters());
+        renderFacets(data.facets);
         renderPoses(data);
         renderPagination(data);
     }
@@ -5,6 +5,7 @@
  */
 const PracticeView = (() => {
     // ─── State ─────────────────────────────────
+    const LOAD_PAGE_SIZE = 20;
     let queue = [];          // [{pose_id, english_name, sanskrit_name, side, hold_seconds, category, tags}]
     let searchDebounce = null;
 
@@ -183,13 +184,14 @@ const PracticeView = (() => {
     }
 
     // ─── Load from sequence ────────────────────
+    // Rows loaded with expand=poses carry the full pose (tags included) under `pose`
     function loadFromSequence(poses) {
         queue = poses.map(p => ({
             pose_id: p.pose_id,
             english_name: p.english_name,
             sanskrit_name: p.sanskrit_name,
             category: p.category || '',
-            tags: p.tags || [],
+            tags: p.tags || p.pose?.tags || [],
             side: p.side || 'both',
             hold_seconds: p.hold_seconds || 30,
         }));
@@ -203,44 +205,67 @@ const PracticeView = (() => {
         modal.style.display = 'flex';
 
         const [practices, sequences] = await Promise.all([
-            API.getPractices(),
-            API.getSequences(),
+            API.getPractices({ per_page: LOAD_PAGE_SIZE }),
+            API.getSequences({ per_page: LOAD_PAGE_SIZE }),
         ]);
 
         let html = '';
-        if (practices.length > 0) {
+        if (practices.practices.length > 0) {
             html += '<h4 style="color:var(--text-dim);margin:8px 0;">My Practices</h4>';
-            html += practices.map(p => `
-                <div class="load-item" onclick="PracticeView.loadPractice(${p.id})">
-                    <div>
-                        <strong>${p.name}</strong>
-                        <div style="font-size:0.8rem;color:var(--text-dim);">${p.pose_count || 0} poses</div>
-                    </div>
-                    <button class="btn btn-sm btn-danger" onclick="event.stopPropagation();PracticeView.deletePractice(${p.id})">Delete</button>
-                </div>
-            `).join('');
+            html += `<div id="load-practices-items">${practiceItems(practices)}</div>`;
         }
-        if (sequences.length > 0) {
+        if (sequences.sequences.length > 0) {
             html += '<h4 style="color:var(--text-dim);margin:8px 0;">Saved Sequences</h4>';
-            html += sequences.map(s => `
-                <div class="load-item" onclick="PracticeView.loadSequenceById(${s.id})">
-                    <strong>${s.name}</strong>
-                    <span style="font-size:0.8rem;color:var(--text-dim);">${s.pose_count} poses</span>
-                </div>
-            `).join('');
+            html += `<div id="load-sequences-items">${sequenceItems(sequences)}</div>`;
         }
         if (!html) html = '<p style="color:var(--text-dim);">No saved practices or sequences.</p>';
         list.innerHTML = html;
     }
 
+    function practiceItems(data) {
+        return data.practices.map(p => `
+            <div class="load-item" onclick="PracticeView.loadPractice(${p.id})">
+                <div>
+                    <strong>${p.name}</strong>
+                    <div style="font-size:0.8rem;color:var(--text-dim);">${p.pose_count} poses · ${Math.round(p.total_seconds / 60)} min · ${'★'.repeat(p.max_difficulty)}</div>
+                </div>
+                <button class="btn btn-sm btn-danger" onclick="event.stopPropagation();PracticeView.deletePractice(${p.id})">Delete</button>
+            </div>
+        `).join('') + loadMoreButton('practices', data.next_cursor);
+    }
+
+    function sequenceItems(data) {
+        return data.sequences.map(s => `
+            <div class="load-item" onclick="PracticeView.loadSequenceById(${s.id})">
+                <strong>${s.name}</strong>
+                <span style="font-size:0.8rem;color:var(--text-dim);">${s.pose_count} poses</span>
+            </div>
+        `).join('') + loadMoreButton('sequences', data.next_cursor);
+    }
+
+    function loadMoreButton(kind, cursor) {
+        if (!cursor) return '';
+        return `<button class="btn btn-ghost btn-sm load-more" onclick="PracticeView.loadMore('${kind}', '${cursor}')">Load more</button>`;
+    }
+
+    async function loadMore(kind, cursor) {
+        const container = document.getElementById(`load-${kind}-items`);
+        container.querySelector('.load-more')?.remove();
+        const params = { per_page: LOAD_PAGE_SIZE, cursor };
+        const html = kind === 'practices'
+            ? practiceItems(await API.getPractices(params))
+            : sequenceItems(await API.getSequences(params));
+        container.insertAdjacentHTML('beforeend', html);
+    }
+
     async function loadPractice(id) {
-        const data = await API.getPractice(id);
+        const data = await API.getPractice(id, { expand: 'poses' });
         loadFromSequence(data.poses);
         document.getElementById('load-practice-modal').style.display = 'none';
     }
 
     async function loadSequenceById(id) {
-        const data = await API.getSequence(id);
+        const data = await API.getSequence(id, { expand: 'poses' });
         loadFromSequence(data.poses);
         document.getElementById('load-practice-modal').style.display = 'none';
     }
@@ -429,6 +454,7 @@ const PracticeView = (() => {
         updateHoldTime,
         loadFromSequence,
         loadPractice,
+        loadMore,
         loadSequenceById,
         deletePractice,
         dragStart,
@@ -2,6 +2,7 @@
  * sequences.js — Sequence generator & saved sequences.
  */
 const SequencesView = (() => {
+    const SAVED_PAGE_SIZE = 20;
     let currentGenerated = null;
 
     async function init() {
@@ -12,6 +13,26 @@ const SequencesView = (() => {
 
     function bindEvents() {
         document.getElementById('generate-sequence').addEventListener('click', generate);
+        document.getElementById('library-import').addEventListener('change', importLibrary);
+    }
+
+    async function importLibrary(event) {
+        const file = event.target.files[0];
+        event.target.value = '';
+        if (!file) return;
+        try {
+            const result = await API.importLibrary(file);
+            const { sequences, practices } = result.imported;
+            let message = `Imported ${sequences} sequences and ${practices} practices.`;
+            if (result.failed) {
+                message += `\n${result.failed} records skipped:\n` + result.errors.slice(0, 5)
+                    .map(e => `  #${e.record}: ${e.errors.join('; ')}`).join('\n');
+            }
+            alert(message);
+            loadSaved();
+        } catch (err) {
+            alert('Error importing: ' + err.message);
+        }
     }
 
     async function loadStyles() {
@@ -111,22 +132,27 @@ const SequencesView = (() => {
         document.querySelector('[data-tab="practice"]').click();
     }
 
-    async function loadSaved() {
-        const seqs = await API.getSequences();
+    async function loadSaved(cursor) {
+        const data = await API.getSequences({ per_page: SAVED_PAGE_SIZE, cursor });
         const list = document.getElementById('saved-list');
-        if (seqs.length === 0) {
+        list.querySelector('.load-more')?.remove();
+        if (!cursor && data.sequences.length === 0) {
             list.innerHTML = '<p style="color:var(--text-dim);font-size:0.85rem;">No saved sequences yet.</p>';
             return;
         }
-        list.innerHTML = seqs.map(s => `
+        const html = data.sequences.map(s => `
             <div class="saved-seq-card" onclick="SequencesView.viewSaved(${s.id})">
                 <div>
                     <strong>${s.name}</strong>
-                    <div style="font-size:0.8rem;color:var(--text-dim);">${s.style || ''} · ${s.pose_count} poses · ${'★'.repeat(s.difficulty)}</div>
+                    <div style="font-size:0.8rem;color:var(--text-dim);">${s.style || ''} · ${s.pose_count} poses · ${Math.round(s.total_seconds / 60)} min · ${'★'.repeat(s.difficulty)}</div>
                 </div>
                 <span style="font-size:0.78rem;color:var(--text-muted);">${s.created_at || ''}</span>
             </div>
-        `).join('');
+        `).join('') + (data.next_cursor
+            ? `<button class="btn btn-ghost btn-sm load-more" onclick="SequencesView.loadSaved('${data.next_cursor}')">Load more</button>`
+            : '');
+        if (cursor) list.insertAdjacentHTML('beforeend', html);
+        else list.innerHTML = html;
     }
 
     async function viewSaved(id) {
@@ -151,5 +177,5 @@ const SequencesView = (() => {
         return m > 0 ? `${m}:${s.toString().padStart(2, '0')}` : `${s}s`;
     }
 
-    return { init, saveGenerated, practiceGenerated, viewSaved };
+    return { init, saveGenerated, practiceGenerated, viewSaved, loadSaved };
 })();